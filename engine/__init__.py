@@ -1,5 +1,16 @@
 from .game import Game
+from .timer import TimerWheel, Timer
+from .pool import Pool
+from .emitter import Emitter, SpreadEmitter, RingEmitter, SpiralEmitter, BurstEmitter
+from .replay import InputLog, replay
+from .room import Room
+from .dungeon import DungeonGenerator, RoomLayout, generate_room
 from .obstacle import Obstacle, BreakableObstacle
 from .collider import Collider
+from .collision import Broadphase, masks_overlap
+from .response import CollisionTable
+from .damage import DamagePipeline
 from .projectile import Projectile, HomingPorjectile, AcceleratingProjectile
-from .mask import Mask
\ No newline at end of file
+from .mask import Mask
+from .profiling import AllocationProfiler
+from .motion import MotionTracker, extrapolate
@@ -1,9 +1,10 @@
-from typing import Callable
+from typing import Callable, Optional
 import math
 
 from .gameObject import GameObject
+from .geometry import line_distance, line_distances
 from .mask import Mask
-from .utils import vec_orthogonal, vec_addition, vec_opposite, vec_normalize, point_to_line_distance
+from .utils import vec_orthogonal, vec_addition, vec_opposite, vec_normalize, heights_to_mask
 
 
 class Collider:
@@ -12,8 +13,9 @@ class Collider:
 
         Parameters
         ----------
-        heights `list`[`int`]:
-            The heights of which the object can collide at
+        heights `int` | `list`[`int`]:
+            The heights of which the object can collide at, stored as a bitmask where bit `n` is height `n`,
+            2 colliders can only collide if `a.heights & b.heights` is not 0
         mask `Mask`:
             Mask of the object, used for collision detection
         on_collide `Callable`[[GameObject], None]:
@@ -32,15 +34,30 @@ class Collider:
             Checks if the object is in the collided list
         finish_collision_check(self):
             Called once the collision detection is done with this object
+        clone(self) -> `Collider`:
+            New collider of the same class with the same heights and a copy of the mask, creates the colliders of emitter pools
+        reset(self, template `Collider`):
+            Turns a pooled collider back into a copy of the template, reusing its mask
     '''
 
+    # Set by `Pool.acquire` when the collider comes from a pool
+    pool = None
+
     def __init__(self,
-                 heights: list[int],
+                 heights: int | list[int],
                  mask: Mask,):
-        self.heights = heights
+        self.heights = heights_to_mask(heights)
         self.mask = mask
         self.collided: list[GameObject] = []
     
+    def clone(self) -> "Collider":
+        return type(self)(self.heights, self.mask.copy())
+
+    def reset(self, template: "Collider") -> None:
+        self.heights = template.heights
+        self.mask.copy_from(template.mask)
+        self.collided.clear()
+
     def on_collide(self, obj:GameObject):
         if self.check_collided(obj):
             return
@@ -58,9 +75,24 @@ class Collider:
         ...
 
 class FastCollider(Collider):
-    def __init__(self, heights: list[int], mask: Mask):
+    '''
+        Collider for fast moving objects, `on_move` stretches the mask over the whole distance moved in the frame
+
+        Attributes
+        ----------
+        original_mask `Mask`:
+            The mask given at creation, used again when the object is not moving
+    '''
+    # Reused by on_move every frame, kept when a pooled collider is re-initialized
+    _move_mask: Optional[Mask] = None
+
+    def __init__(self, heights: int | list[int], mask: Mask):
         super().__init__(heights, mask)
         self.original_mask = mask
+
+    def reset(self, template: "Collider") -> None:
+        self.mask = self.original_mask
+        super().reset(template)
     
     def on_move(self, move_vec:tuple[int|float, int|float]):
         if move_vec == (0, 0):
@@ -90,8 +122,8 @@ class FastCollider(Collider):
             center = self.mask.center
             corners = self.mask.corners
 
-            points_distance = [(corner, round(point_to_line_distance(corner, (center, vec_addition(center, move_vec))), 1)) for corner in corners]
-            distances = list(map(lambda x:x[1], points_distance))
+            distances = [round(distance, 1) for distance in line_distances(corners, center, vec_addition(center, move_vec))]
+            points_distance = list(zip(corners, distances))
 
             furthest_points = [
                 [corner for corner, _ in filter(lambda x: x[1] == max(distances), points_distance)], 
@@ -106,7 +138,7 @@ class FastCollider(Collider):
                 no_projection_corners.append(keep_corner)
                 longest_distance = 0
                 for corner in furthest_points[0][1::]:
-                    distance = point_to_line_distance(corner, new_line)
+                    distance = line_distance(corner, *new_line)
                     if distance > longest_distance:
                         no_projection_corners.append(corner)
                         try:
@@ -123,7 +155,7 @@ class FastCollider(Collider):
                 no_projection_corners.append(keep_corner)
                 longest_distance = 0
                 for corner in furthest_points[1][1::]:
-                    distance = point_to_line_distance(corner, new_line)
+                    distance = line_distance(corner, *new_line)
                     if distance > longest_distance:
                         no_projection_corners.append(corner)
                         try:
@@ -135,8 +167,7 @@ class FastCollider(Collider):
 
                 new_line = (keep_corner, new_line[1])
 
-            for corner in corners:
-                distance = point_to_line_distance(corner, new_line)
+            for corner, distance in zip(corners, line_distances(corners, *new_line)):
                 if distance > 0 or corner in no_projection_corners:
                     new_mask_corners.append(corner)
                 elif distance < 0 and corner:
@@ -150,4 +181,8 @@ class FastCollider(Collider):
                         new_mask_corners.append((corner[0] + move_vec[0], corner[1] + move_vec[1]))
         
         
-        self.mask = Mask(corners=new_mask_corners)
\ No newline at end of file
+        if self._move_mask is None:
+            self._move_mask = Mask(corners=new_mask_corners)
+        else:
+            self._move_mask.set_corners(new_mask_corners)
+        self.mask = self._move_mask
\ No newline at end of file
@@ -0,0 +1,153 @@
+from typing import Iterator
+import math
+
+from .mask import Mask
+
+
+def _axes(corners: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    '''Edge normals of a polygon, the separating axes to test'''
+    axes = []
+    count = len(corners)
+    for i in range(count):
+        x1, y1 = corners[i]
+        x2, y2 = corners[(i + 1) % count]
+        axes.append((y2 - y1, x1 - x2))
+    return axes
+
+
+def _project(corners: list[tuple[float, float]], offset_x: float, offset_y: float, axis: tuple[float, float]) -> tuple[float, float]:
+    ax, ay = axis
+    projections = [(x + offset_x) * ax + (y + offset_y) * ay for x, y in corners]
+    return min(projections), max(projections)
+
+
+def _project_circle(center_x: float, center_y: float, radius: float, axis: tuple[float, float]) -> tuple[float, float]:
+    ax, ay = axis
+    projection = center_x * ax + center_y * ay
+    extent = radius * math.sqrt(ax * ax + ay * ay)
+    return projection - extent, projection + extent
+
+
+def masks_overlap(mask_a: Mask, pos_a: tuple[int|float, int|float], mask_b: Mask, pos_b: tuple[int|float, int|float]) -> bool:
+    '''Returns True if the 2 masks overlap, using the separating axis theorem
+
+    Parameters
+    ----------
+    mask_a, mask_b `Mask`:
+        The masks to test, polygons must be convex
+    pos_a, pos_b `tuple`[`int`, `int`]:
+        Position of the object each mask belongs to, mask coordinates are relative to it
+    '''
+    ax, ay = pos_a
+    bx, by = pos_b
+    if mask_a.radius and mask_b.radius:
+        distance = math.hypot(ax + mask_a.center_x - bx - mask_b.center_x, ay + mask_a.center_y - by - mask_b.center_y)
+        return distance < mask_a.radius + mask_b.radius
+
+    if mask_a.radius:
+        mask_a, mask_b = mask_b, mask_a
+        ax, ay, bx, by = bx, by, ax, ay
+
+    corners = mask_a.corners
+    if mask_b.radius:
+        circle_x, circle_y = bx + mask_b.center_x, by + mask_b.center_y
+        # The axis from the circle to the closest corner covers the case where the circle touches a corner
+        closest = min(corners, key=lambda corner: (corner[0] + ax - circle_x) ** 2 + (corner[1] + ay - circle_y) ** 2)
+        axes = _axes(corners)
+        axes.append((closest[0] + ax - circle_x, closest[1] + ay - circle_y))
+        for axis in axes:
+            if axis == (0, 0):
+                continue
+            min_a, max_a = _project(corners, ax, ay, axis)
+            min_b, max_b = _project_circle(circle_x, circle_y, mask_b.radius, axis)
+            if max_a <= min_b or max_b <= min_a:
+                return False
+        return True
+
+    other_corners = mask_b.corners
+    for axis in _axes(corners) + _axes(other_corners):
+        if axis == (0, 0):
+            continue
+        min_a, max_a = _project(corners, ax, ay, axis)
+        min_b, max_b = _project(other_corners, bx, by, axis)
+        if max_a <= min_b or max_b <= min_a:
+            return False
+    return True
+
+
+def objects_overlap(obj_a, obj_b) -> bool:
+    '''Returns True if the colliders of 2 game objects share a height and overlap, objects without a collider never overlap'''
+    collider_a, collider_b = obj_a.collider, obj_b.collider
+    if not collider_a or not collider_b or not collider_a.heights & collider_b.heights:
+        return False
+    return masks_overlap(collider_a.mask, (obj_a.x, obj_a.y), collider_b.mask, (obj_b.x, obj_b.y))
+
+
+def layers(heights: int) -> Iterator[int]:
+    '''Yields every set bit of a heights bitmask as its own single bit mask'''
+    while heights:
+        layer = heights & -heights
+        yield layer
+        heights ^= layer
+
+
+class Broadphase:
+    '''
+        Buckets objects per height layer, so only objects sharing a layer are tested against each other
+
+        Methods
+        -------
+        insert(self, obj `GameObject`):
+            Adds the object to the bucket of every layer it collides at
+        clear(self):
+            Empties every bucket, the buckets are rebuilt every tick
+        candidates(self, obj `GameObject`) -> `list`[`GameObject`]:
+            Objects sharing at least one layer with the object, each only once
+        contacts(self, objects `list`[`GameObject`]) -> `list`[`tuple`[`GameObject`, `GameObject`]]:
+            Pairs of (object, inserted object) that overlap
+    '''
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, list] = {}
+
+    def insert(self, obj) -> None:
+        if not obj.collider:
+            return
+        buckets = self.buckets
+        for layer in layers(obj.collider.heights):
+            bucket = buckets.get(layer)
+            if bucket is None:
+                buckets[layer] = [obj]
+            else:
+                bucket.append(obj)
+
+    def clear(self) -> None:
+        self.buckets.clear()
+
+    def candidates(self, obj) -> list:
+        if not obj.collider:
+            return []
+        heights = obj.collider.heights
+        if heights & (heights - 1) == 0:
+            # Single layer, the common case, no duplicates possible
+            return self.buckets.get(heights, [])
+        seen = set()
+        candidates = []
+        for layer in layers(heights):
+            for other in self.buckets.get(layer, ()):
+                if id(other) not in seen:
+                    seen.add(id(other))
+                    candidates.append(other)
+        return candidates
+
+    def contacts(self, objects: list) -> list[tuple]:
+        pairs = []
+        for obj in objects:
+            collider = obj.collider
+            if not collider:
+                continue
+            position = (obj.x, obj.y)
+            for other in self.candidates(obj):
+                if other is not obj and masks_overlap(collider.mask, position, other.collider.mask, (other.x, other.y)):
+                    pairs.append((obj, other))
+        return pairs
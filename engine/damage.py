@@ -0,0 +1,117 @@
+from random import Random
+from typing import Optional
+
+from .gameObject import GameObject
+
+
+class DamagePipeline:
+    '''
+        Collects every hit of a tick and resolves them together in `resolve`
+
+        The hits are kept as columns, one list per value, and all the random rolls of the tick are drawn in one go,
+        mitigation is looked up once per target and each target's hp is only written once, however many hits it took
+
+        Resolution of each hit
+        ----------------------
+        - hit chance: `accuracy / (accuracy + evade)` of the source and target, always hits if either is not set
+        - critical hit: chance of `crit_rate`, damage multiplied by `1 + crit_bonus`
+        - mitigation: `damage * (1 - resistance) - defence` of the target, at least 0, nothing if the target is `immune`
+        - hp is clamped at 0, targets reaching 0 die (`on_death`) or break (`on_break`) once all hits are applied
+
+        Attributes
+        ----------
+        events `list`[`tuple`[`GameObject`, `int`, `bool`]]:
+            (target, damage dealt, critical) of every landed hit in the last `resolve`, misses are not included
+
+        Methods
+        -------
+        add(self, source `GameObject` | None, target `GameObject`, damage `int`|`float`):
+            Queues a hit
+        add_area(self, source `GameObject` | None, targets `list`[`GameObject`], damage `int`|`float`):
+            Queues the same hit on every target, for area damage
+        resolve(self, rng `Random`) -> `list`[`GameObject`]:
+            Resolves every queued hit and returns the targets that died or broke
+    '''
+
+    def __init__(self) -> None:
+        self.targets: list[GameObject] = []
+        self.damages: list[int | float] = []
+        self.accuracies: list[Optional[int]] = []
+        self.crit_rates: list[float] = []
+        self.crit_bonuses: list[float] = []
+        self.events: list[tuple[GameObject, int, bool]] = []
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def add(self, source: Optional[GameObject], target: GameObject, damage: int | float) -> None:
+        self.targets.append(target)
+        self.damages.append(damage)
+        self.accuracies.append(getattr(source, "accuracy", None))
+        self.crit_rates.append(getattr(source, "crit_rate", 0))
+        self.crit_bonuses.append(getattr(source, "crit_bonus", 0))
+
+    def add_area(self, source: Optional[GameObject], targets: list[GameObject], damage: int | float) -> None:
+        count = len(targets)
+        self.targets.extend(targets)
+        self.damages.extend([damage] * count)
+        self.accuracies.extend([getattr(source, "accuracy", None)] * count)
+        self.crit_rates.extend([getattr(source, "crit_rate", 0)] * count)
+        self.crit_bonuses.extend([getattr(source, "crit_bonus", 0)] * count)
+
+    def clear(self) -> None:
+        self.targets.clear()
+        self.damages.clear()
+        self.accuracies.clear()
+        self.crit_rates.clear()
+        self.crit_bonuses.clear()
+
+    def resolve(self, rng: Random) -> list[GameObject]:
+        self.events = events = []
+        count = len(self.targets)
+        if not count:
+            return []
+        random = rng.random
+        hit_rolls = [random() for _ in range(count)]
+        crit_rolls = [random() for _ in range(count)]
+
+        # (evade, defence, resistance, immune) of each target, looked up once
+        mitigation: dict[GameObject, tuple] = {}
+        totals: dict[GameObject, int] = {}
+        for target, damage, accuracy, crit_rate, crit_bonus, hit_roll, crit_roll in zip(
+                self.targets, self.damages, self.accuracies, self.crit_rates, self.crit_bonuses, hit_rolls, crit_rolls):
+            stats = mitigation.get(target)
+            if stats is None:
+                stats = mitigation[target] = (
+                    getattr(target, "evade", 0),
+                    getattr(target, "defence", 0),
+                    getattr(target, "resistance", 0),
+                    getattr(target, "immune", False) or not target.alive,
+                )
+            evade, defence, resistance, immune = stats
+            if immune:
+                continue
+            if accuracy and evade and hit_roll * (accuracy + evade) >= accuracy:
+                continue
+            critical = crit_roll < crit_rate
+            if critical:
+                damage *= 1 + crit_bonus
+            dealt = max(round(damage * (1 - resistance) - defence), 0)
+            totals[target] = totals.get(target, 0) + dealt
+            events.append((target, dealt, critical))
+        self.clear()
+
+        defeated = []
+        for target, total in totals.items():
+            if not total:
+                continue
+            target.hp = max(target.hp - total, 0)
+            if target.hp == 0:
+                target.alive = False
+                defeated.append(target)
+        for target in defeated:
+            if hasattr(target, "on_break"):
+                target.on_break()
+            elif hasattr(target, "on_death"):
+                target.on_death()
+        return defeated
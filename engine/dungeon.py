@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Callable, Optional
+import asyncio
+import itertools
+import random
+
+from .collider import Collider
+from .gameObject import GameObject
+from .mask import Mask
+from .obstacle import Obstacle, BreakableObstacle
+
+ROOM_WIDTH = 1280
+ROOM_HEIGHT = 720
+WALL = 16
+
+
+class RoomLayout:
+    '''
+        Generated layout of a room, plain data so it can be sent between processes and cached
+
+        Attributes
+        ----------
+        room_id `int`:
+            Id of the room in the dungeon
+        obstacles `list`[`tuple`]:
+            (x, y, width, height, heights, thickness) of every obstacle
+        breakables `list`[`tuple`]:
+            (x, y, width, height, heights, thickness, hp, resistance) of every breakable obstacle
+        spawns `list`[`tuple`[`str`, `int`, `int`]]:
+            (enemy name, x, y) of the enemies of the room
+        exits `list`[`int`]:
+            Ids of the rooms this room leads to
+
+        Methods
+        -------
+        build(self) -> `list`[`GameObject`]:
+            Creates the obstacles of the layout, used as the layout loader of a `Room`
+    '''
+
+    def __init__(self, room_id: int, obstacles: list[tuple], breakables: list[tuple], spawns: list[tuple], exits: list[int]) -> None:
+        self.room_id = room_id
+        self.obstacles = obstacles
+        self.breakables = breakables
+        self.spawns = spawns
+        self.exits = exits
+
+    def build(self) -> list[GameObject]:
+        objects: list[GameObject] = []
+        for x, y, width, height, heights, thickness in self.obstacles:
+            objects.append(Obstacle(x, y, heights, thickness, Collider(heights, Mask(width, height))))
+        for x, y, width, height, heights, thickness, hp, resistance in self.breakables:
+            objects.append(BreakableObstacle(x, y, heights, thickness, Collider(heights, Mask(width, height)), hp, hp, False, resistance))
+        return objects
+
+
+def generate_room(seed: int, difficulty: int, room_id: int) -> RoomLayout:
+    '''Generates the layout of a room, the same seed, difficulty and room id always give the same layout'''
+    rng = random.Random(f"{seed}:{difficulty}:{room_id}")
+    every_height = 0b111
+    obstacles = [
+        (0, 0, ROOM_WIDTH, WALL, every_height, -1),
+        (0, ROOM_HEIGHT - WALL, ROOM_WIDTH, WALL, every_height, -1),
+        (0, 0, WALL, ROOM_HEIGHT, every_height, -1),
+        (ROOM_WIDTH - WALL, 0, WALL, ROOM_HEIGHT, every_height, -1),
+    ]
+    for _ in range(rng.randint(2, 4 + difficulty)):
+        width, height = rng.randint(1, 4) * 32, rng.randint(1, 4) * 32
+        obstacles.append((rng.randrange(WALL, ROOM_WIDTH - WALL - width), rng.randrange(WALL, ROOM_HEIGHT - WALL - height),
+                          width, height, rng.choice((0b001, 0b011, every_height)), rng.choice((1, 2, -1))))
+
+    breakables = []
+    for _ in range(rng.randint(0, 3 + difficulty * 2)):
+        breakables.append((rng.randrange(WALL, ROOM_WIDTH - WALL - 32), rng.randrange(WALL, ROOM_HEIGHT - WALL - 32),
+                           32, 32, 0b001, 1, 20 + 10 * difficulty, rng.choice((0, 0.25, 0.5))))
+
+    spawns = [(rng.choice(("slime", "skeleton", "archer")), rng.randrange(64, ROOM_WIDTH - 64), rng.randrange(64, ROOM_HEIGHT - 64))
+              for _ in range(rng.randint(1 + difficulty, 3 + difficulty * 2))]
+    exits = [room_id + 1] + ([room_id + 2] if rng.random() < 0.3 else [])
+    return RoomLayout(room_id, obstacles, breakables, spawns, exits)
+
+
+class DungeonGenerator:
+    '''
+        Generates room layouts in a worker pool ahead of demand and keeps them in a bounded cache
+
+        Parameters
+        ----------
+        workers `int`:
+            Number of worker processes, 0 generates in the calling process when a layout is needed
+        cache_size `int`:
+            Maximum number of layouts kept, the least recently used ones are dropped first
+        lookahead `int`:
+            Number of rooms past the one being entered that are generated in advance
+        warm_seeds `int`:
+            Number of dungeon seeds per difficulty kept with their first rooms ready, handed out by `take_seed`
+
+        Methods
+        -------
+        prefetch(self, seed `int`, difficulty `int`, room_ids `list`[`int`]):
+            Starts generating the rooms that are not cached yet
+        get(self, seed `int`, difficulty `int`, room_id `int`) -> `RoomLayout`:
+            Returns the layout, waiting for it if it is still being generated
+        get_async(self, seed `int`, difficulty `int`, room_id `int`) -> `RoomLayout`:
+            Same as `get` without blocking the event loop
+        take_seed(self, difficulty `int`) -> `int`:
+            Returns a seed whose first rooms are already generated or in progress, and starts warming up a new one
+        loader(self, seed `int`, difficulty `int`) -> `Callable`[[`int`], `list`[`GameObject`]]:
+            Layout loader for `Game`, loading a room also prefetches the next `lookahead` rooms
+        shutdown(self):
+            Stops the worker pool
+    '''
+
+    def __init__(self, workers: int = 1, cache_size: int = 256, lookahead: int = 2, warm_seeds: int = 4) -> None:
+        self.executor: Optional[Executor] = ProcessPoolExecutor(workers) if workers else None
+        self.cache_size = cache_size
+        self.lookahead = lookahead
+        self.warm_seeds = warm_seeds
+        self.cache: OrderedDict[tuple[int, int, int], Future | RoomLayout] = OrderedDict()
+        self.warm: dict[int, list[int]] = {}
+        self._seeds = itertools.count(random.getrandbits(32))
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: tuple[int, int, int], value: Future | RoomLayout) -> None:
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def prefetch(self, seed: int, difficulty: int, room_ids: list[int]) -> None:
+        if not self.executor:
+            return
+        for room_id in room_ids:
+            key = (seed, difficulty, room_id)
+            if key not in self.cache:
+                self._store(key, self.executor.submit(generate_room, seed, difficulty, room_id))
+
+    def _lookup(self, seed: int, difficulty: int, room_id: int) -> Future | RoomLayout:
+        key = (seed, difficulty, room_id)
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.executor.submit(generate_room, seed, difficulty, room_id) if self.executor else generate_room(seed, difficulty, room_id)
+            self._store(key, entry)
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return entry
+
+    def _resolved(self, key: tuple[int, int, int], layout: RoomLayout) -> RoomLayout:
+        # Replace the finished future so later lookups skip it
+        if key in self.cache:
+            self.cache[key] = layout
+        return layout
+
+    def get(self, seed: int, difficulty: int, room_id: int) -> RoomLayout:
+        entry = self._lookup(seed, difficulty, room_id)
+        if isinstance(entry, Future):
+            entry = self._resolved((seed, difficulty, room_id), entry.result())
+        return entry
+
+    async def get_async(self, seed: int, difficulty: int, room_id: int) -> RoomLayout:
+        entry = self._lookup(seed, difficulty, room_id)
+        if isinstance(entry, Future):
+            entry = self._resolved((seed, difficulty, room_id), await asyncio.wrap_future(entry))
+        return entry
+
+    def take_seed(self, difficulty: int) -> int:
+        seeds = self.warm.setdefault(difficulty, [])
+        while len(seeds) <= self.warm_seeds:
+            seed = next(self._seeds)
+            self.prefetch(seed, difficulty, list(range(self.lookahead + 1)))
+            seeds.append(seed)
+        return seeds.pop(0)
+
+    def loader(self, seed: int, difficulty: int) -> Callable[[int], list[GameObject]]:
+        def load_layout(room_id: int) -> list[GameObject]:
+            self.prefetch(seed, difficulty, list(range(room_id + 1, room_id + 1 + self.lookahead)))
+            return self.get(seed, difficulty, room_id).build()
+        return load_layout
+
+    def stats(self) -> dict:
+        return {"cached": len(self.cache), "hits": self.hits, "misses": self.misses}
+
+    def shutdown(self) -> None:
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,151 @@
+from typing import Optional
+import math
+
+from .collider import Collider
+
+
+class Emitter:
+    '''
+        Spawns a pattern of projectiles in one batch, the angle offsets and speed scales of the pattern are calculated once at creation
+
+        Parameters
+        ----------
+        offsets `list`[`float`]:
+            Angle offsets in radians of each projectile, relative to the angle the emitter is fired at
+        speed_scales `list`[`float`] | None:
+            Speed multiplier of each projectile, defaults to 1 for all of them
+
+        Methods
+        -------
+        emit(self, game `Game`, cls `type`, x `int`, y `int`, angle `float`, speed `int`|`float`, collider `Collider` | None, **kwargs) -> `list`[`Projectile`]:
+            Acquires the projectiles from the game's pool for `cls` and adds them to the game in one insertion,
+            `kwargs` are the rest of the projectile arguments and must be given by keyword.
+            Each projectile gets a copy of `collider` taken from the game's collider pool, the template itself is never used by a projectile.
+            The projectiles share the same timer, so the game schedules a single expiry timer for the batch
+
+        Tips
+        ----
+        Weapons should keep their emitter as an attribute and call emit in `on_attack(angle)`
+    '''
+
+    def __init__(self, offsets: list[float], speed_scales: Optional[list[float]] = None) -> None:
+        if speed_scales and len(speed_scales) != len(offsets):
+            raise ValueError("speed_scales must have one value per projectile")
+        self.offsets = tuple(offsets)
+        self.speed_scales = tuple(speed_scales) if speed_scales else (1,) * len(offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def next_phase(self) -> float:
+        '''Angle added to the whole pattern for the next emit, used by rotating patterns'''
+        return 0
+
+    def emit(self,
+             game,
+             cls: type,
+             x: int,
+             y: int,
+             angle: float,
+             speed: int | float,
+             collider: Optional[Collider] = None,
+             **kwargs) -> list:
+        angle += self.next_phase()
+        acquire = game.get_pool(cls).acquire
+        if collider is None:
+            projectiles = [
+                acquire(x=x, y=y, speed=speed * scale, angle=angle + offset, collider=None, **kwargs)
+                for offset, scale in zip(self.offsets, self.speed_scales)
+            ]
+        else:
+            collider_cls = type(collider)
+            acquire_collider = game.get_pool(collider_cls, factory=collider_cls.clone, reset=collider_cls.reset).acquire
+            projectiles = [
+                acquire(x=x, y=y, speed=speed * scale, angle=angle + offset, collider=acquire_collider(collider), **kwargs)
+                for offset, scale in zip(self.offsets, self.speed_scales)
+            ]
+        game.add_projectiles(projectiles)
+        return projectiles
+
+
+class SpreadEmitter(Emitter):
+    '''
+        Projectiles evenly spread over an arc centered on the aimed angle
+
+        Parameters
+        ----------
+        count `int`:
+            Number of projectiles
+        arc `float`:
+            Angle in radians between the first and the last projectile
+    '''
+
+    def __init__(self, count: int, arc: float) -> None:
+        if count == 1:
+            super().__init__([0])
+            return
+        step = arc / (count - 1)
+        super().__init__([-arc / 2 + step * i for i in range(count)])
+
+
+class RingEmitter(Emitter):
+    '''
+        Projectiles evenly spread over a full circle, starting from the aimed angle
+
+        Parameters
+        ----------
+        count `int`:
+            Number of projectiles
+    '''
+
+    def __init__(self, count: int) -> None:
+        step = 2 * math.pi / count
+        super().__init__([step * i for i in range(count)])
+
+
+class SpiralEmitter(Emitter):
+    '''
+        Ring of `arms` projectiles that rotates by `step` every time it is emitted
+
+        Parameters
+        ----------
+        arms `int`:
+            Number of projectiles per emit
+        step `float`:
+            Rotation in radians added after every emit
+    '''
+
+    def __init__(self, arms: int, step: float) -> None:
+        arm_step = 2 * math.pi / arms
+        super().__init__([arm_step * i for i in range(arms)])
+        self.step = step
+        self.phase = 0.0
+
+    def next_phase(self) -> float:
+        phase = self.phase
+        self.phase = (phase + self.step) % (2 * math.pi)
+        return phase
+
+
+class BurstEmitter(Emitter):
+    '''
+        Projectiles fired in the same direction at different speeds, so they travel as a line
+
+        Parameters
+        ----------
+        count `int`:
+            Number of projectiles
+        min_scale `float`:
+            Speed multiplier of the slowest projectile, the fastest one moves at the given speed
+        arc `float`:
+            Angle in radians the projectiles are spread over, 0 for a straight line
+    '''
+
+    def __init__(self, count: int, min_scale: float = 0.5, arc: float = 0) -> None:
+        if count == 1:
+            super().__init__([0])
+            return
+        scale_step = (1 - min_scale) / (count - 1)
+        angle_step = arc / (count - 1)
+        super().__init__([-arc / 2 + angle_step * i for i in range(count)],
+                         [min_scale + scale_step * i for i in range(count)])
@@ -1,7 +1,404 @@
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import hashlib
+import random
+import struct
+
+from .collision import Broadphase, objects_overlap
+from .damage import DamagePipeline
+from .history import PositionHistory
+from .inputs import InputBuffer
+from .pool import Pool
+from .projectile import expire_batch
+from .profiling import AllocationProfiler
+from .replay import InputLog, encode_name, MOVE, ATTACK, HASH, LATENCY, JOIN, REMOVE, ENTER, LEAVE, HIBERNATE
+from .response import CollisionTable, default_collision_table
+from .room import Room
+from .timer import TimerWheel
+
+_STATE = struct.Struct("<qq")
+_HP = struct.Struct("<d")
+
+
+def _no_profiler(phase: str) -> None:
+    pass
 
 
 class Game:
-    def __init__(self, max_players:int = 2, config:dict|None = None) -> None:
+    '''
+        Runs a single match, the simulation advances in fixed ticks of `1 / tick_rate` seconds
+
+        Parameters
+        ----------
+        max_players `int`:
+            Maximum number of players in the game
+        config `dict` | None:
+            Extra game settings, `pool_caps` maps class names to the cap of their object pool,
+            `history_ticks` and `history_objects` size the position history used for lag compensation, objects past `history_objects` are not rewound,
+            `hibernate_after` is the number of seconds an empty room keeps its objects before hibernating
+        tick_rate `int`:
+            Number of ticks per second
+        seed `int` | None:
+            Seed of the game's random number generator, random if not given
+        record `bool`:
+            Records every input in `input_log` so the session can be replayed with `engine.replay`,
+            players joining, leaving and moving between rooms are recorded as well, those calls must happen between ticks
+        load_layout `Callable`[[`int`], `list`[`GameObject`]] | None:
+            Creates the obstacles and enemies of a room from its id, rooms are empty if not given
+        profiler `AllocationProfiler` | None:
+            Debug profiler told about every phase of `update`, see `engine.profiling`
+
+        Attributes
+        ----------
+        timers `TimerWheel`:
+            Shared timer wheel, used for weapon cooldowns, projectile timers and stat change expiry
+        projectiles `list`[`Projectile`]:
+            Every projectile currently in the game
+        pools `dict`[`type`, `Pool`]:
+            Object pools per archetype, see `get_pool`
+        random `random.Random`:
+            Random number generator of the game, anything random in the simulation must use it for replays to stay deterministic
+        input_log `InputLog` | None:
+            Log of the inputs applied so far, only when recording
+        history `PositionHistory`:
+            Positions of the players and of the objects of active rooms over the last ticks
+        rooms `dict`[`int`, `Room`]:
+            Rooms created so far, only rooms with players in them are updated
+        collisions `CollisionTable`:
+            Collision responses, every tick the contacts of the projectiles with players and room objects are dispatched through it
+        damage `DamagePipeline`:
+            Hits of the current tick, resolved together after the collisions
+
+        Methods
+        -------
+        get_pool(self, cls `type`, factory, reset) -> `Pool`:
+            Returns the object pool for the class, creating it on first use with the given factory and reset, see `Pool`
+        pool_stats(self) -> `dict`:
+            Usage counters of every pool, keyed by class name
+        add_player(self, player `Player`):
+            Adds a player to the game and starts recording their position
+        remove_player(self, player `Player`):
+            Removes a player from the game, the players after them move down one index
+        get_room(self, room_id `int`) -> `Room`:
+            Returns the room, creating it without loading its layout if needed
+        enter_room(self, player `Player`, room `Room`):
+            Moves the player into the room, activating it
+        leave_room(self, player `Player`):
+            Takes the player out of their room, for disconnects and menus, the room hibernates once it has been empty for `hibernate_after` seconds
+        hibernate(self):
+            Hibernates every room without players straight away, used when the game stops ticking
+        resolve_collisions(self):
+            Finds the contacts of every projectile with the objects and players of its room and dispatches them through `collisions`,
+            each projectile is checked against the positions its source saw, `latency` seconds ago
+        rewound(self, latency `float`):
+            Context manager, moves every player and room object back to where they were `latency` seconds ago
+        find_hits(self, obj `GameObject`, targets `list`[`GameObject`], latency `float`) -> `list`[`GameObject`]:
+            Targets colliding with the object as they were seen by someone with the given latency
+        add_projectile(self, projectile `Projectile`):
+            Adds a projectile to the room of its source and hands its timer over to the timer wheel
+        add_projectiles(self, projectiles `list`[`Projectile`]):
+            Adds a batch of projectiles in one insertion, used by emitters, projectiles with the same timer share one timer
+        queue_input(self, kind `int`, player_index `int`, *values):
+            Queues an input for the next tick in the player's `InputBuffer`, see `engine.replay` for the kinds of inputs
+        state_hash(self) -> `int`:
+            64 bit hash of the simulation state (positions, hp of players and room objects, random number generator state), used to check replays
+        update(self):
+            Advances the game by one tick
+    '''
+    def __init__(self, max_players:int = 2, config:dict|None = None, tick_rate:int = 60, seed:Optional[int] = None, record:bool = False, load_layout:Optional[Callable[[int], list]] = None, profiler:Optional[AllocationProfiler] = None) -> None:
         self.max_players = max_players
         self.config = config
-        self.players = []
\ No newline at end of file
+        self.players = []
+        self.projectiles = []
+        self.tick_rate = tick_rate
+        self.tick_duration = 1 / tick_rate
+        self.timers = TimerWheel(self.tick_duration)
+        self.pools: dict[type, Pool] = {}
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.input_buffers: list[InputBuffer] = []
+        self.pending_players: list[int] = []
+        self.input_log: Optional[InputLog] = InputLog(self.seed, tick_rate) if record else None
+        config = config or {}
+        self.history = PositionHistory(config.get("history_ticks", tick_rate), config.get("history_objects", 256))
+        self.hibernate_after: float = config.get("hibernate_after", 30)
+        self.load_layout = load_layout
+        self.rooms: dict[int, Room] = {}
+        self.active_rooms: list[Room] = []
+        self.broadphase = Broadphase()
+        self.damage = DamagePipeline()
+        self.collisions: CollisionTable = default_collision_table(self.damage)
+        self.profiler = profiler
+
+    @property
+    def current_tick(self) -> int:
+        return self.timers.current_tick
+
+    def get_pool(self, cls:type, factory:Optional[Callable] = None, reset:Optional[Callable] = None) -> Pool:
+        pool = self.pools.get(cls)
+        if pool is None:
+            caps = (self.config or {}).get("pool_caps", {})
+            pool = self.pools[cls] = Pool(factory or cls, caps.get(cls.__name__, 256), reset)
+        return pool
+
+    def pool_stats(self) -> dict:
+        return {cls.__name__: pool.stats() for cls, pool in self.pools.items()}
+
+    def _record_event(self, kind:int, *values) -> None:
+        '''Events happen between ticks, they are replayed before the next one'''
+        if self.input_log is not None:
+            self.input_log.record(self.current_tick + 1, kind, *values)
+
+    def add_player(self, player) -> None:
+        self._record_event(JOIN, encode_name(player.player_name))
+        self.players.append(player)
+        self.input_buffers.append(InputBuffer())
+        self.history.track(player, self.current_tick)
+
+    def remove_player(self, player) -> None:
+        '''Removes the player along with their pending inputs, the players after them move down one index'''
+        self.leave_room(player)
+        index = self.players.index(player)
+        self._record_event(REMOVE, index)
+        del self.players[index]
+        del self.input_buffers[index]
+        self.pending_players = [i if i < index else i - 1 for i in self.pending_players if i != index]
+        self.history.untrack(player)
+
+    def get_room(self, room_id:int) -> Room:
+        room = self.rooms.get(room_id)
+        if room is None:
+            load_layout = self.load_layout
+            room = self.rooms[room_id] = Room(room_id, (lambda: load_layout(room_id)) if load_layout else list)
+        return room
+
+    def enter_room(self, player, room:Room) -> None:
+        if player.room is room and player in room.players:
+            return
+        self.leave_room(player)
+        self._record_event(ENTER, self.players.index(player), room.room_id)
+        room.activate()
+        if not room.players:
+            self.active_rooms.append(room)
+            tick = self.current_tick
+            for obj in room.objects:
+                self.history.track(obj, tick)
+        room.players.add(player)
+        player.room = room
+
+    def leave_room(self, player) -> None:
+        room = player.room
+        if room is None or player not in room.players:
+            return
+        self._record_event(LEAVE, self.players.index(player))
+        room.players.discard(player)
+        if not room.players:
+            self.active_rooms.remove(room)
+            for obj in room.objects:
+                self.history.untrack(obj)
+            room.hibernate_timer = self.timers.schedule(self.hibernate_after, room.hibernate)
+
+    def hibernate(self) -> None:
+        self._record_event(HIBERNATE)
+        for room in self.rooms.values():
+            if not room.players:
+                if room.hibernate_timer:
+                    room.hibernate_timer.cancel()
+                room.hibernate()
+
+    @contextmanager
+    def rewound(self, latency:float) -> Iterator[None]:
+        with self.history.rewind(self.current_tick - self._rewind_ticks(latency)):
+            yield
+
+    def _rewind_ticks(self, latency:float) -> int:
+        return min(round(latency / self.tick_duration), self.history.capacity - 1)
+
+    def find_hits(self, obj, targets:list, latency:float) -> list:
+        '''Lag compensated hit check, `obj` itself is not rewound, usually a projectile checked with the latency of its source'''
+        if not latency:
+            return [target for target in targets if target is not obj and objects_overlap(obj, target)]
+        x, y = obj.x, obj.y
+        with self.rewound(latency):
+            # The object keeps its current position even if it is tracked
+            obj.x, obj.y = x, y
+            return [target for target in targets if target is not obj and objects_overlap(obj, target)]
+
+    def add_projectile(self, projectile) -> None:
+        projectile.room = getattr(projectile.source, "room", None)
+        projectile.schedule_expiry(self.timers)
+        self.projectiles.append(projectile)
+
+    def add_projectiles(self, projectiles:list) -> None:
+        '''Projectiles of the batch with the same timer share a single timer on the wheel'''
+        batches: dict[float, list] = {}
+        for projectile in projectiles:
+            projectile.room = getattr(projectile.source, "room", None)
+            if projectile.timer:
+                batch = batches.get(projectile.timer)
+                if batch is None:
+                    batches[projectile.timer] = [projectile]
+                else:
+                    batch.append(projectile)
+        timers = self.timers
+        for delay, batch in batches.items():
+            if len(batch) == 1:
+                batch[0].schedule_expiry(timers)
+                continue
+            timer = timers.schedule(delay, expire_batch, batch)
+            for projectile in batch:
+                projectile.cancel_expiry()
+                projectile.expiry_timer = timer
+        self.projectiles.extend(projectiles)
+
+    def queue_input(self, kind:int, player_index:int, *values) -> None:
+        buffer = self.input_buffers[player_index]
+        if not buffer:
+            self.pending_players.append(player_index)
+        buffer.push(kind, *values)
+
+    def queue_inputs(self, player_index:int, inputs:InputBuffer) -> None:
+        '''Queues a whole buffer of inputs at once, used when inputs are batched before reaching the game'''
+        buffer = self.input_buffers[player_index]
+        if not buffer:
+            self.pending_players.append(player_index)
+        buffer.extend(inputs)
+
+    def apply_inputs(self) -> None:
+        '''Input phase of the tick, applies the latest movement and then every action of each player with pending inputs\n
+        Inputs of dead players are still recorded but only their latency is applied'''
+        tick = self.current_tick
+        log = self.input_log
+        players = self.players
+        timers = self.timers
+        for player_index in self.pending_players:
+            buffer = self.input_buffers[player_index]
+            player = players[player_index]
+            alive = player.alive
+            movement = buffer.movement
+            if movement is not None:
+                if log is not None:
+                    log.record(tick, MOVE, player_index, *movement)
+                if alive:
+                    player.direction = movement
+            for kind, *values in buffer.actions:
+                if log is not None:
+                    log.record(tick, kind, player_index, *values)
+                if kind == ATTACK and alive and player.weapon and player.weapon.ready:
+                    player.weapon.on_attack(values[0])
+                    player.weapon.start_cooldown(timers)
+                elif kind == LATENCY:
+                    player.latency = values[0]
+            buffer.clear()
+        self.pending_players.clear()
+
+    def state_hash(self) -> int:
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(_STATE.pack(self.current_tick, len(self.projectiles)))
+        version, rng_state, gauss_next = self.random.getstate()
+        digest.update(array("Q", rng_state).tobytes())
+        digest.update(_HP.pack(-1 if gauss_next is None else gauss_next))
+        for player in self.players:
+            digest.update(_STATE.pack(player.x, player.y))
+            digest.update(_HP.pack(player.hp))
+        for room in self.rooms.values():
+            for obj in room.objects:
+                hp = getattr(obj, "hp", None)
+                if hp is not None:
+                    digest.update(_HP.pack(hp if obj.alive else -1))
+        for projectile in self.projectiles:
+            digest.update(_STATE.pack(projectile.x, projectile.y))
+        return int.from_bytes(digest.digest(), "little")
+
+    def resolve_collisions(self) -> None:
+        '''Every room shares the same coordinates, so each room gets its own broadphase pass with only its objects and players'''
+        rooms: dict[Room, list] = {}
+        for projectile in self.projectiles:
+            room = projectile.room
+            if projectile.alive and room is not None and room.players:
+                room_projectiles = rooms.get(room)
+                if room_projectiles is None:
+                    rooms[room] = [projectile]
+                else:
+                    room_projectiles.append(projectile)
+        if not rooms:
+            return
+        broadphase = self.broadphase
+        contacts = []
+        for room, projectiles in rooms.items():
+            broadphase.clear()
+            for obj in room.objects:
+                if obj.alive:
+                    broadphase.insert(obj)
+            # In game order rather than from the room's set, so contacts and the damage rolls they lead to stay in the same order in replays
+            for player in self.players:
+                if player.alive and player.room is room and player in room.players:
+                    broadphase.insert(player)
+            # Projectiles are grouped by how far back their source sees, the history only moves tracked objects so projectiles stay where they are
+            groups: dict[int, list] = {}
+            for projectile in projectiles:
+                ticks = self._rewind_ticks(getattr(projectile.source, "latency", 0))
+                group = groups.get(ticks)
+                if group is None:
+                    groups[ticks] = [projectile]
+                else:
+                    group.append(projectile)
+            for ticks, group in groups.items():
+                if ticks:
+                    with self.history.rewind(self.current_tick - ticks):
+                        contacts.extend(broadphase.contacts(group))
+                else:
+                    contacts.extend(broadphase.contacts(group))
+        broadphase.clear()
+        if contacts:
+            # A projectile never hits whoever shot it
+            self.collisions.dispatch([pair for pair in contacts if pair[0].source is not pair[1]])
+
+    def update(self) -> None:
+        dt = self.tick_duration
+        profiler = self.profiler
+        mark = profiler.mark if profiler is not None else _no_profiler
+        mark("timers")
+        self.timers.tick()
+        mark("inputs")
+        if self.pending_players:
+            self.apply_inputs()
+        mark("players")
+        for player in self.players:
+            if player.alive:
+                player.update(dt)
+        mark("rooms")
+        for room in self.active_rooms:
+            room.update(dt)
+        mark("projectiles")
+        for projectile in self.projectiles:
+            projectile.update(dt)
+        mark("collisions")
+        self.resolve_collisions()
+        mark("damage")
+        if self.damage:
+            self.damage.resolve(self.random)
+
+        mark("cleanup")
+        # Expired projectiles are only released once they are out of the list, so a pool never hands out an object still in use
+        alive = []
+        for projectile in self.projectiles:
+            if projectile.alive:
+                alive.append(projectile)
+                continue
+            projectile.cancel_expiry()
+            if projectile.collider and projectile.collider.pool is not None:
+                projectile.collider.pool.release(projectile.collider)
+            if projectile.pool is not None:
+                projectile.pool.release(projectile)
+        self.projectiles = alive
+        self.history.record(self.current_tick)
+
+        log = self.input_log
+        if log is not None:
+            log.ticks = self.current_tick
+            if log.hash_interval and log.ticks % log.hash_interval == 0:
+                log.record(log.ticks, HASH, self.state_hash())
+        if profiler is not None:
+            profiler.end_tick()
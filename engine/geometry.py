@@ -0,0 +1,31 @@
+'''
+Geometry kernels used in the hot path by `FastCollider.on_move` and `Mask.rotate`
+
+Same math as `utils.point_to_line_distance` and the rotation it replaced, without the type checks and with the per line work done once.
+Masks have a handful of corners, too few for array libraries to pay for building their arrays
+'''
+import math
+
+
+def line_distance(point: tuple[int|float, int|float], line_pt_1: tuple[int|float, int|float], line_pt_2: tuple[int|float, int|float]) -> float:
+    '''Same as `utils.point_to_line_distance` with a line given by 2 points, without the type checks'''
+    return ((line_pt_2[0] - line_pt_1[0]) * (line_pt_1[1] - point[1]) - (line_pt_1[0] - point[0]) * (
+        line_pt_2[1] - line_pt_1[1])) / math.sqrt((line_pt_2[0] - line_pt_1[0]) ** 2 + (line_pt_2[1] - line_pt_1[1]) ** 2)
+
+
+def line_distances(points: list[tuple[int|float, int|float]], line_pt_1: tuple[int|float, int|float], line_pt_2: tuple[int|float, int|float]) -> list[float]:
+    '''Distance of every point to the line going through the 2 points, see `utils.point_to_line_distance` for the sign'''
+    x1, y1 = line_pt_1
+    dx, dy = line_pt_2[0] - x1, line_pt_2[1] - y1
+    norm = math.sqrt(dx ** 2 + dy ** 2)
+    return [(dx * (y1 - y) - (x1 - x) * dy) / norm for x, y in points]
+
+
+def rotate_points(points: list[tuple[int|float, int|float]], cosang: float, sinang: float, pivot_x: float, pivot_y: float) -> list[tuple[float, float]]:
+    '''Rotates every point around the pivot, clockwise on screen for a positive angle'''
+    rotated = []
+    for x, y in points:
+        tx, ty = x - pivot_x, y - pivot_y
+        rotated.append(((tx * cosang + ty * sinang) + pivot_x, (-tx * sinang + ty * cosang) + pivot_y))
+    return rotated
+
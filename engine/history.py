@@ -0,0 +1,120 @@
+from array import array
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class PositionHistory:
+    '''
+        Fixed-size ring buffer of the positions of tracked objects over the last ticks, used for lag compensation
+
+        Positions are stored in flat arrays indexed by `(tick % capacity) * max_objects + slot`.
+        Only positions are rewound, masks are relative to their object and the tracked objects (players and room objects) never change theirs
+
+        Parameters
+        ----------
+        capacity `int`:
+            Number of ticks kept
+        max_objects `int`:
+            Maximum number of objects tracked at once
+
+        Attributes
+        ----------
+        overflows `int`:
+            Number of objects that were not tracked because the history was full, they are checked at their current position
+
+        Methods
+        -------
+        track(self, obj `GameObject`) -> `bool`:
+            Starts recording the object, False if the history is full
+        untrack(self, obj `GameObject`):
+            Stops recording the object and frees its slot
+        record(self, tick `int`):
+            Stores the current position of every tracked object for the tick
+        position_at(self, obj `GameObject`, tick `int`) -> `tuple`[`int`, `int`] | None:
+            Position of the object at the tick, None if it is not in the history
+        rewind(self, tick `int`):
+            Context manager, moves every tracked object back to where it was at the tick and restores them on exit
+    '''
+
+    def __init__(self, capacity: int, max_objects: int) -> None:
+        self.capacity = capacity
+        self.max_objects = max_objects
+        size = capacity * max_objects
+        self.xs = array("d", bytes(8 * size))
+        self.ys = array("d", bytes(8 * size))
+        # Tick stored in each row, -1 if the row is empty
+        self.ticks = array("q", [-1] * capacity)
+        # Tick the object in each slot started being tracked at, older rows belong to the previous owner of the slot
+        self.since = array("q", [0] * max_objects)
+        self.slots: dict = {}
+        self.free_slots = list(range(max_objects - 1, -1, -1))
+        self.overflows = 0
+
+    def track(self, obj, tick: int = 0) -> bool:
+        if obj in self.slots:
+            return True
+        if not self.free_slots:
+            # A crowded room loses lag compensation for its extra objects instead of failing the tick
+            self.overflows += 1
+            return False
+        slot = self.free_slots.pop()
+        self.slots[obj] = slot
+        self.since[slot] = tick
+        return True
+
+    def untrack(self, obj) -> None:
+        slot = self.slots.pop(obj, None)
+        if slot is not None:
+            self.free_slots.append(slot)
+
+    def record(self, tick: int) -> None:
+        row = tick % self.capacity
+        self.ticks[row] = tick
+        base = row * self.max_objects
+        xs, ys = self.xs, self.ys
+        for obj, slot in self.slots.items():
+            index = base + slot
+            xs[index] = obj.x
+            ys[index] = obj.y
+
+    def _row(self, tick: int) -> Optional[int]:
+        '''Row holding the tick, the latest row before it if it was not recorded, or the oldest row if the tick is too old'''
+        row = tick % self.capacity
+        if self.ticks[row] == tick:
+            return row
+        recorded = [(stored, row) for row, stored in enumerate(self.ticks) if stored >= 0]
+        if not recorded:
+            return None
+        before = [entry for entry in recorded if entry[0] <= tick]
+        return max(before)[1] if before else min(recorded)[1]
+
+    def position_at(self, obj, tick: int) -> Optional[tuple[int, int]]:
+        slot = self.slots.get(obj)
+        row = self._row(tick)
+        if slot is None or row is None or self.ticks[row] < self.since[slot]:
+            return None
+        index = row * self.max_objects + slot
+        return round(self.xs[index]), round(self.ys[index])
+
+    @contextmanager
+    def rewind(self, tick: int) -> Iterator[None]:
+        row = self._row(tick)
+        if row is None:
+            yield
+            return
+        stored_tick = self.ticks[row]
+        base = row * self.max_objects
+        saved = []
+        for obj, slot in self.slots.items():
+            if stored_tick < self.since[slot]:
+                continue
+            index = base + slot
+            saved.append((obj, obj.x, obj.y))
+            obj.x = round(self.xs[index])
+            obj.y = round(self.ys[index])
+        try:
+            yield
+        finally:
+            for obj, x, y in saved:
+                obj.x = x
+                obj.y = y
@@ -0,0 +1,49 @@
+from .replay import MOVE
+
+
+class InputBuffer:
+    '''
+        Inputs of a player waiting for the next tick
+
+        Movement is coalesced, only the latest direction received before the tick is kept,
+        discrete actions (attacks, skills) are all kept in the order they arrived
+
+        Attributes
+        ----------
+        movement `tuple`[`float`, `float`] | None:
+            Latest movement direction, None if no movement was received
+        actions `list`[`tuple`]:
+            (kind, *values) of every action received
+
+        Methods
+        -------
+        push(self, kind `int`, *values):
+            Adds an input, see `engine.replay` for the kinds of inputs
+        extend(self, other `InputBuffer`):
+            Adds the inputs of another buffer received after the ones of this buffer
+        clear(self):
+            Empties the buffer once the inputs are applied
+    '''
+    __slots__ = ("movement", "actions")
+
+    def __init__(self) -> None:
+        self.movement: tuple[float, float] | None = None
+        self.actions: list[tuple] = []
+
+    def __bool__(self) -> bool:
+        return self.movement is not None or bool(self.actions)
+
+    def push(self, kind: int, *values) -> None:
+        if kind == MOVE:
+            self.movement = values
+        else:
+            self.actions.append((kind, *values))
+
+    def extend(self, other: "InputBuffer") -> None:
+        if other.movement is not None:
+            self.movement = other.movement
+        self.actions.extend(other.actions)
+
+    def clear(self) -> None:
+        self.movement = None
+        self.actions = []
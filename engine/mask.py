@@ -1,6 +1,8 @@
 from typing import Optional
 import math
 
+from .geometry import rotate_points
+
 
 class Mask:
     '''
@@ -23,6 +25,15 @@ class Mask:
             The size of the mask
         center: (center_x, center_y)
             The coordinates of the center of the mask
+
+        Methods
+        -------
+        rotate(self, degrees, pivot):
+            Rotates the corners of the mask around the pivot, or the center of the polygon if no pivot is given
+        set_corners(self, corners):
+            Replaces the corners of the mask in place
+        copy(self) -> `Mask` / copy_from(self, other `Mask`):
+            Returns a copy of the mask / turns the mask into a copy of the other one in place, used by pooled colliders
     '''
 
     def __init__(self,
@@ -39,12 +50,7 @@ class Mask:
         self.radius = radius
         self.corners = corners
         if corners:
-            x_coordinates = list(map(lambda x: x[0], corners))
-            y_coordinates = list(map(lambda x: x[1], corners))
-            self.size = self.width, self.height = max(
-                x_coordinates), max(y_coordinates)
-            self.center = self.center_x, self.center_y = sum(
-                x_coordinates) / len(x_coordinates), sum(y_coordinates) / len(y_coordinates)
+            self.set_corners(corners)
         elif radius:
             self.center = self.center_x, self.center_y = radius, radius
             self.size = self.width, self.height = radius * 2, radius * 2
@@ -70,22 +76,33 @@ class Mask:
             pivot_x, pivot_y = pivot
 
         # Calculate new corners
-        new_corners = []
-        for p in self.corners:
-            x, y = p[0], p[1]
-            tx, ty = x - pivot_x, y - pivot_y
-            new_x = (tx * cosang + ty * sinang) + pivot_x
-            new_y = (-tx * sinang + ty * cosang) + pivot_y
-            new_corners.append((new_x, new_y))
+        new_corners = rotate_points(self.corners, cosang, sinang, pivot_x, pivot_y)
 
         # Update attributes
-        self.corners = new_corners
-        x_coordinates = map(lambda x: x[0], new_corners)
-        y_coordinates = map(lambda x: x[1], new_corners)
+        self.set_corners(new_corners)
+
+    def set_corners(self, corners: list[tuple[int, int]]):
+        '''Replaces the corners of the mask in place and recalculates its size and center, turns a circle mask into a polygon\n
+        Used to reuse a mask instead of creating a new one every frame'''
+        self.radius = None
+        self.corners = corners
+        x_coordinates = [corner[0] for corner in corners]
+        y_coordinates = [corner[1] for corner in corners]
         self.size = self.width, self.height = max(
             x_coordinates), max(y_coordinates)
         self.center = self.center_x, self.center_y = sum(
-            x_coordinates) / len(list(x_coordinates)), sum(y_coordinates) / len(list(y_coordinates))
+            x_coordinates) / len(x_coordinates), sum(y_coordinates) / len(y_coordinates)
+
+    def copy(self) -> "Mask":
+        mask = Mask.__new__(Mask)
+        mask.copy_from(self)
+        return mask
+
+    def copy_from(self, other: "Mask") -> None:
+        self.radius = other.radius
+        self.corners = list(other.corners) if other.corners else other.corners
+        self.size = self.width, self.height = other.size
+        self.center = self.center_x, self.center_y = other.center
 
     def get_centerx(self, obj_x:int) -> int:
         return round(obj_x + self.center_x)
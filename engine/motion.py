@@ -0,0 +1,67 @@
+from typing import Iterable, Iterator
+import itertools
+import math
+
+
+def extrapolate(motion: tuple, tick: int, tick_duration: float) -> tuple[int, int]:
+    '''Position of a projectile at the tick from its motion descriptor (tick, x, y, speed, angle, acceleration)\n
+    Steps the same integration as `Projectile.move` and `AcceleratingProjectile.move`, so it lands on the simulated position exactly'''
+    start, x, y, speed, angle, acceleration = motion
+    cos, sin = math.cos(angle), math.sin(angle)
+    half_step = acceleration * 0.5 * tick_duration
+    for _ in range(tick - start):
+        speed += half_step
+        move_distance = speed * tick_duration
+        x += round(move_distance * cos)
+        y += round(move_distance * sin)
+        speed += half_step
+    return x, y
+
+
+class MotionTracker:
+    '''
+        Motion descriptors of the projectiles of a game, so snapshots only carry a projectile when its motion changes
+
+        A descriptor is (tick, x, y, speed, angle, acceleration), the state of the projectile at the end of the tick,
+        clients move it forward with `extrapolate`. Descriptors are only rebuilt when a projectile sets `motion_changed`:
+        when it spawns, a homing projectile turns or a hit uses up pierce. Anything else changing the speed or angle of a projectile must set it too.
+        Projectiles no longer in the game are reported as expired
+
+        Attributes
+        ----------
+        sent `dict`[`int`, `tuple`]:
+            Last descriptor reported for every projectile still alive, by projectile id
+
+        Methods
+        -------
+        describe(self, projectiles `list`[`Projectile`], tick `int`) -> `Iterator`[`tuple`[`int`, `tuple`]]:
+            (id, descriptor) of every projectile, giving ids to new projectiles and refreshing the descriptors of changed ones
+        diff(self, descriptors `Iterable`[`tuple`[`int`, `tuple`]]) -> `tuple`[`list`[`tuple`], `list`[`int`]]:
+            The (id, *descriptor) that changed since the last call and the ids that expired
+        full(self) -> `list`[`tuple`]:
+            (id, *descriptor) of every projectile, sent to clients that (re)connect
+    '''
+
+    def __init__(self) -> None:
+        self.sent: dict[int, tuple] = {}
+        self._ids = itertools.count()
+
+    def describe(self, projectiles: list, tick: int) -> Iterator[tuple[int, tuple]]:
+        for projectile in projectiles:
+            if projectile.motion_changed:
+                if projectile.motion_id is None:
+                    projectile.motion_id = next(self._ids)
+                projectile.motion = (tick, projectile.x, projectile.y, projectile.speed, projectile.angle, getattr(projectile, "acceleration", 0))
+                projectile.motion_changed = False
+            yield projectile.motion_id, projectile.motion
+
+    def diff(self, descriptors: Iterable[tuple[int, tuple]]) -> tuple[list[tuple], list[int]]:
+        previous = self.sent
+        current = dict(descriptors)
+        changed = [(motion_id, *motion) for motion_id, motion in current.items() if previous.get(motion_id) != motion]
+        expired = [motion_id for motion_id in previous if motion_id not in current]
+        self.sent = current
+        return changed, expired
+
+    def full(self) -> list[tuple]:
+        return [(motion_id, *motion) for motion_id, motion in self.sent.items()]
@@ -2,14 +2,16 @@ from typing import Literal, Optional
 
 from .gameObject import GameObject
 from .collider import Collider
+from .utils import heights_to_mask
 
 class Obstacle(GameObject):
     '''Represents any non-movable obstacles in the game
     
     Attributes
     ----------
-    heights `list[int]`:
-        see also `Collider`
+    heights `int`:
+        bitmask of the heights, read from the collider which is what the broadphase uses, 0 without a collider.
+        The `heights` argument, a bitmask or a `list[int]`, is set on the collider, see also `Collider`
     thickness `int`:
         pierce reduction when projectiles hit, -1 for absolute blocking
     
@@ -17,11 +19,16 @@ class Obstacle(GameObject):
     ----
     Obstacle should not be the one handling collision, therefore, on_collide should not be implemented unless otherwise needed
     '''
-    def __init__(self, x: int, y: int, heights:list[int], thickness:int, collider:Optional[Collider], alive: bool = True):
+    def __init__(self, x: int, y: int, heights:int|list[int], thickness:int, collider:Optional[Collider], alive: bool = True):
         super().__init__(x, y, collider, alive)
-        self.heights = heights
+        if collider is not None:
+            collider.heights = heights_to_mask(heights)
         self.thickness = thickness
 
+    @property
+    def heights(self) -> int:
+        return self.collider.heights if self.collider else 0
+
     def update(self, dt: float):
         return super().update(dt)
     
@@ -55,7 +62,7 @@ class BreakableObstacle(Obstacle):
     ----
     Refer to `Obstacle`
     '''
-    def __init__(self, x: int, y: int, heights: list[int], thickness: int, collider: Collider | None, hp:int, max_hp:int, immune:bool, resistance:float, alive: bool = True):
+    def __init__(self, x: int, y: int, heights: int | list[int], thickness: int, collider: Collider | None, hp:int, max_hp:int, immune:bool, resistance:float, alive: bool = True):
         super().__init__(x, y, heights, thickness, collider, alive)
         self.hp = hp
         self.max_hp = max_hp
@@ -1,9 +1,31 @@
-from typing import Literal
+from typing import Literal, Optional
+import math
 
+from .collider import Collider
 from .gameObject import GameObject
+from .timer import Timer, TimerWheel
 from .weapon import AbstractWeapon
 
 class Player(GameObject):
+    '''
+        Represents a player in the game
+
+        Attributes
+        ----------
+        direction `tuple`[`float`, `float`]:
+            Direction the player is moving in, set by the movement input, directions longer than 1 are scaled down to 1
+        latency `float`:
+            Estimated delay in seconds between the game state and what the player sees, projectiles of the player are checked
+            against positions that old, set through `LATENCY` inputs so replays stay deterministic
+        room `Room` | None:
+            The room the player is in, kept while the player is away so they can come back to it
+        hp `int`:
+            Current hp of the player, starts at `max_hp`
+        immune `bool`:
+            if the player is immune to damage at that moment
+        resistance `float`:
+            damage taken reduction of the player, in percentage of damage reduced
+    '''
     def __init__(self, 
                  player_name:str, 
                  x:int, 
@@ -17,16 +39,26 @@ class Player(GameObject):
                  evade:int,
                  speed:int,
                  crit_rate:float,
-                 crit_bonus:float
+                 crit_bonus:float,
+                 collider:Optional[Collider] = None,
+                 alive:bool = True
                  ):
         self.player_name = player_name
         self.x = x
         self.y = y
+        self.collider = collider
+        self.alive = alive
+        self.latency:float = 0
+        self.room = None
+        self.direction: tuple[float, float] = (0, 0)
         
         self.weapon = weapon
         self.skills = skills
 
         self.max_hp = max_hp
+        self.hp = max_hp
+        self.immune = False
+        self.resistance: float = 0
         self.attack = attack
         self.defence = defence
         self.accuracy = accuracy
@@ -46,9 +78,26 @@ class Player(GameObject):
             "crit_damage":[]
         }
 
+    def add_stat_change(self, stat:str, amount:int|float, duration:float, timers:TimerWheel) -> Timer:
+        '''Adds a temporary stat change, the timer wheel removes it once `duration` seconds have passed\n
+        Cancel the returned timer to make the change permanent'''
+        self.stat_changes[stat].append(amount)
+        return timers.schedule(duration, self.stat_changes[stat].remove, amount)
+
     
+    def on_death(self):
+        ...
+
     def update(self, dt: float):
-        return super().update(dt)
+        '''Moves the player along `direction`, set from the movement input'''
+        dx, dy = self.direction
+        if dx or dy:
+            length = math.hypot(dx, dy)
+            if length > 1:
+                dx, dy = dx / length, dy / length
+            move_distance = self.speed * dt
+            self.x += round(dx * move_distance)
+            self.y += round(dy * move_distance)
 
         
     def draw(self, camera_pos: tuple[int, int]):
@@ -0,0 +1,94 @@
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Pool(Generic[T]):
+    '''
+        Free-list pool of reusable objects of a single archetype
+
+        Objects handed out by the pool get a `pool` attribute pointing back to it,
+        the owner releases them once they are done with (for projectiles, after `on_expire`)
+
+        Parameters
+        ----------
+        factory `Callable`[..., T]:
+            Creates a new object when the free list is empty, usually the class itself
+        cap `int`:
+            Maximum number of free objects kept, released objects over the cap are left to the GC
+        reset `Callable`[..., None] | None:
+            Re-initializes a reused object with the arguments given to `acquire`, defaults to calling `__init__` again
+
+        Attributes
+        ----------
+        hits `int`:
+            Number of acquires served from the free list
+        misses `int`:
+            Number of acquires that had to create a new object
+        dropped `int`:
+            Number of released objects discarded because the pool was full
+
+        Methods
+        -------
+        acquire(self, *args, **kwargs) -> T:
+            Returns a free object re-initialized with the arguments, or a new one
+        release(self, obj T):
+            Returns the object to the free list
+        prefill(self, count `int`, *args, **kwargs):
+            Creates objects ahead of time so the first acquires do not allocate
+        stats(self) -> `dict`:
+            Pool usage counters, used for reporting hit rates
+    '''
+
+    def __init__(self, factory: Callable[..., T], cap: int = 256, reset: Optional[Callable[..., None]] = None) -> None:
+        self.factory = factory
+        self.cap = cap
+        self.reset = reset
+        self.free: list[T] = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.free)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def acquire(self, *args, **kwargs) -> T:
+        if self.free:
+            obj = self.free.pop()
+            self.hits += 1
+            if self.reset:
+                self.reset(obj, *args, **kwargs)
+            else:
+                obj.__init__(*args, **kwargs)
+        else:
+            obj = self.factory(*args, **kwargs)
+            self.misses += 1
+        obj.pool = self
+        return obj
+
+    def release(self, obj: T) -> None:
+        if len(self.free) >= self.cap:
+            self.dropped += 1
+            return
+        self.free.append(obj)
+
+    def prefill(self, count: int, *args, **kwargs) -> None:
+        for _ in range(min(count, self.cap - len(self.free))):
+            obj = self.factory(*args, **kwargs)
+            obj.pool = self
+            self.free.append(obj)
+
+    def stats(self) -> dict:
+        return {
+            "free": len(self.free),
+            "cap": self.cap,
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,242 @@
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+import ast
+import gc
+import os
+import statistics
+import time
+import tracemalloc
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def _functions(filename: str) -> list[tuple[int, int, str]]:
+    '''(first line, last line, qualified name) of every function in the file, innermost functions last'''
+    try:
+        with open(filename) as file:
+            tree = ast.parse(file.read())
+    except (OSError, SyntaxError):
+        return []
+    functions = []
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+                name = prefix + child.name
+                if not isinstance(child, ast.ClassDef):
+                    functions.append((child.lineno, child.end_lineno, name))
+                visit(child, name + ".")
+            else:
+                visit(child, prefix)
+    visit(tree, "")
+    return functions
+
+
+def function_at(filename: str, lineno: int) -> str:
+    '''Name of the engine function containing the line, as `module:function`'''
+    name = "<module>"
+    for first, last, qualname in _functions(filename):
+        if first <= lineno <= last:
+            name = qualname
+    return f"{os.path.splitext(os.path.relpath(filename, ENGINE_DIR))[0].replace(os.sep, '.')}:{name}"
+
+
+class AllocationProfiler:
+    '''
+        Debug profiler attributing memory allocations to the phases of a tick and to the engine functions doing them,
+        and timing every garbage collection through `gc.callbacks`
+
+        The game calls `mark` at the start of each phase of `Game.update` and `end_tick` at the end.
+        The peak traced memory above the start of a phase is measured every tick, it counts short lived objects
+        like the tuples returned by `utils` helpers that are gone by the end of the phase.
+        Every `sample_interval` ticks a tracemalloc snapshot is also taken between phases, the difference between 2 snapshots
+        is what the phase left allocated, grouped by engine function. Net allocations of GC tracked objects are what trigger collections.
+        Collections happening while a snapshot is taken or compared are left out of the GC statistics. The profiler never collects itself,
+        which would reset the allocation counter and move the game's own collections, so the snapshot allocations can still bring the next one forward
+        Snapshots are slow, this is meant for benchmarks and debugging, not for production servers
+
+        Parameters
+        ----------
+        sample_interval `int`:
+            Number of ticks between snapshot samples, 0 only measures peaks and GC pauses
+        trace `bool`:
+            Traces allocations with tracemalloc, only GC pauses are recorded if False
+        max_pauses `int`:
+            Number of most recent GC pauses kept for the percentiles
+
+        Attributes
+        ----------
+        phases `dict`[`str`, `dict`[`str`, `float`]]:
+            Totals per phase: `peak_bytes`, `net_bytes`, `net_blocks` and `gc_ms`
+        functions `dict`[`str`, `list`[`int`]]:
+            Total [net bytes, net blocks] per engine function, over the sampled ticks
+        gc_pauses `deque`[`float`]:
+            Duration in seconds of the most recent collections
+
+        Methods
+        -------
+        start(self) / stop(self):
+            Starts tracing and registers the GC callback / undoes both
+        mark(self, phase `str`):
+            Ends the current phase and starts the next one
+        end_tick(self):
+            Ends the last phase of the tick
+        stats(self, top `int`) -> `dict`:
+            Per tick averages of the phases, the `top` functions by net bytes and the GC pause statistics, in bytes and milliseconds
+        report(self, top `int`) -> `str`:
+            `stats` formatted for the command line
+    '''
+
+    def __init__(self, sample_interval: int = 60, trace: bool = True, max_pauses: int = 4096) -> None:
+        self.sample_interval = sample_interval
+        self.trace = trace
+        self.ticks = 0
+        self.sampled_ticks = 0
+        self.phases: dict[str, dict[str, float]] = {}
+        self.functions: dict[str, list[int]] = {}
+        self.gc_pauses: deque[float] = deque(maxlen=max_pauses)
+        self.gc_collections = [0, 0, 0]
+        self.gc_collected = 0
+        self.phase: Optional[str] = None
+        self._phase_start = 0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._sampling = False
+        self._gc_start = 0.0
+        self._gc_ignored = False
+        self._filters = [tracemalloc.Filter(True, os.path.join(ENGINE_DIR, "*")), tracemalloc.Filter(False, __file__)]
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
+    def stop(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _on_gc(self, event: str, info: dict) -> None:
+        if event == "start":
+            self._gc_start = time.perf_counter()
+            return
+        if self._gc_ignored:
+            return
+        pause = time.perf_counter() - self._gc_start
+        self.gc_pauses.append(pause)
+        self.gc_collections[info["generation"]] += 1
+        self.gc_collected += info["collected"]
+        if self.phase is not None:
+            self.phases[self.phase]["gc_ms"] += pause * 1000
+
+    @contextmanager
+    def _own_work(self) -> Iterator[None]:
+        '''Leaves the collections triggered by the profiler's own snapshots and comparisons out of the GC statistics'''
+        self._gc_ignored = True
+        try:
+            yield
+        finally:
+            self._gc_ignored = False
+
+    def _end_phase(self) -> None:
+        phase = self.phases[self.phase]
+        current, peak = tracemalloc.get_traced_memory()
+        phase["peak_bytes"] += peak - self._phase_start
+        if self._sampling:
+            with self._own_work():
+                self._compare_snapshot(phase)
+
+    def _compare_snapshot(self, phase: dict[str, float]) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        functions = self.functions
+        for diff in snapshot.compare_to(self._snapshot, "lineno"):
+            if not diff.size_diff and not diff.count_diff:
+                continue
+            frame = diff.traceback[0]
+            totals = functions.get(name := function_at(frame.filename, frame.lineno))
+            if totals is None:
+                totals = functions[name] = [0, 0]
+            totals[0] += diff.size_diff
+            totals[1] += diff.count_diff
+            phase["net_bytes"] += diff.size_diff
+            phase["net_blocks"] += diff.count_diff
+        self._snapshot = snapshot
+
+    def mark(self, phase: str) -> None:
+        tracing = tracemalloc.is_tracing()
+        if self.phase is None:
+            self._sampling = tracing and bool(self.sample_interval) and self.ticks % self.sample_interval == 0
+            if self._sampling:
+                with self._own_work():
+                    self._snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        elif tracing:
+            self._end_phase()
+        self.phase = phase
+        if phase not in self.phases:
+            self.phases[phase] = {"peak_bytes": 0, "net_bytes": 0, "net_blocks": 0, "gc_ms": 0.0}
+        if tracing:
+            tracemalloc.reset_peak()
+            self._phase_start = tracemalloc.get_traced_memory()[0]
+
+    def end_tick(self) -> None:
+        if self.phase is not None and tracemalloc.is_tracing():
+            self._end_phase()
+        if self._sampling:
+            self.sampled_ticks += 1
+            self._sampling = False
+            self._snapshot = None
+        self.phase = None
+        self.ticks += 1
+
+    def stats(self, top: int = 10) -> dict:
+        ticks = self.ticks or 1
+        sampled = self.sampled_ticks or 1
+        pauses = [pause * 1000 for pause in self.gc_pauses]
+        functions = sorted(self.functions.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            "ticks": self.ticks,
+            "sampled_ticks": self.sampled_ticks,
+            "phases": {
+                name: {
+                    "peak_bytes": phase["peak_bytes"] / ticks,
+                    "net_bytes": phase["net_bytes"] / sampled,
+                    "net_blocks": phase["net_blocks"] / sampled,
+                    "gc_ms": phase["gc_ms"] / ticks,
+                } for name, phase in self.phases.items()
+            },
+            "functions": [{"function": name, "net_bytes": size / sampled, "net_blocks": count / sampled} for name, (size, count) in functions],
+            "gc": {
+                "collections": list(self.gc_collections),
+                "collected": self.gc_collected,
+                "pause_total_ms": sum(pauses),
+                "pause_max_ms": max(pauses, default=0),
+                "pause_p99_ms": statistics.quantiles(pauses, n=100)[98] if len(pauses) > 1 else sum(pauses),
+            },
+        }
+
+    def report(self, top: int = 10) -> str:
+        return format_stats(self.stats(top))
+
+
+def format_stats(stats: dict) -> str:
+    '''Formats the result of `AllocationProfiler.stats`, also used on the stats sent by the server'''
+    gc_stats = stats["gc"]
+    lines = [
+        f"gc: {'/'.join(map(str, gc_stats['collections']))} collections (gen 0/1/2), {gc_stats['collected']} objects collected, "
+        f"pauses ms: total {gc_stats['pause_total_ms']:.2f}, max {gc_stats['pause_max_ms']:.3f}, p99 {gc_stats['pause_p99_ms']:.3f}",
+        f"per tick over {stats['ticks']} ticks ({stats['sampled_ticks']} sampled): phase, peak bytes, net bytes, net blocks, gc ms",
+    ]
+    for name, phase in stats["phases"].items():
+        lines.append(f"  {name:<12} {phase['peak_bytes']:>10.0f} {phase['net_bytes']:>10.0f} {phase['net_blocks']:>8.1f} {phase['gc_ms']:>8.3f}")
+    if stats["functions"]:
+        lines.append("net allocations per sampled tick by function: bytes, blocks")
+        for function in stats["functions"]:
+            lines.append(f"  {function['function']:<48} {function['net_bytes']:>10.0f} {function['net_blocks']:>8.1f}")
+    return "\n".join(lines)
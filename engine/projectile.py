@@ -1,12 +1,12 @@
 import math
 from typing import Callable, Optional, Literal
-from copy import deepcopy
 
 from engine.mask import Mask
 
 from .gameObject import GameObject
 from .collider import Collider, FastCollider
 from .obstacle import Obstacle
+from .timer import Timer, TimerWheel
 from .utils import get_angle, resolve, point_to_line_distance, get_mid_pt
 
 
@@ -28,8 +28,8 @@ class Projectile(GameObject):
             Speed of the projectile in pixels
         angle `float`:
             The angle of the projectile it is aimed at, respective to the horizontal
-        heights list[`int`]:
-            The heights of the projectile, used for collision detection and ignoring
+        heights `int`:
+            Bitmask of the heights of the projectile, kept on its collider, used for collision detection and ignoring
         damage `int`:
             The damage this projectile can deal
         source `GameObject`:
@@ -40,6 +40,14 @@ class Projectile(GameObject):
             The distance the bullet can travel before disappearing
         timer `int`|`float`:
             The time the bullet can travel before disappearing
+        expiry_timer `Timer`|`None`:
+            Set by `schedule_expiry`, when set the timer is handled by the game's timer wheel instead of being counted down in `move`
+        motion_changed `bool`:
+            Set when the projectile spawns or its trajectory changes outside of `move`, tells `MotionTracker` to send a new descriptor
+        motion_id `int`|`None` / motion `tuple`|`None`:
+            Id and last motion descriptor given by `MotionTracker`
+        room `Room`|`None`:
+            Room of the source when the projectile was added to the game, it only collides with what is in that room
 
         Methods
         -------
@@ -47,10 +55,18 @@ class Projectile(GameObject):
             Called every loop to update the position of the projectile
         move: 
             The function used to move the projectile
+        schedule_expiry:
+            Hands the timer over to the timer wheel, which calls on_expire when it runs out
+        cancel_expiry:
+            Stops the expiry timer, a timer shared with the rest of an emitted batch keeps running for the others
         on_expire:
-            Things to do once the pierce is used up, travel distance limit hits, or the projectile times out
+            Things to do once the pierce is used up, travel distance limit hits, or the projectile times out,
+            when overriding, call super().on_expire() so the projectile is removed from the game and returned to its pool
     '''
 
+    # Set by `Pool.acquire` when the projectile comes from a pool
+    pool = None
+
     def __init__(self,
                  name: str,
                  description: str,
@@ -75,15 +91,36 @@ class Projectile(GameObject):
         self.pierce = pierce
         self.range = range
         self.timer = timer
+        self.expiry_timer: Optional[Timer] = None
+        self.motion_changed = True
+        self.motion_id: Optional[int] = None
+        self.motion: Optional[tuple] = None
+        self.room = None
+
+    def schedule_expiry(self, timers: TimerWheel):
+        '''Schedules on_expire on the timer wheel, does nothing if the projectile has no timer'''
+        if not self.timer:
+            return
+        self.cancel_expiry()
+        self.expiry_timer = timers.schedule(self.timer, self.on_expire)
+
+    def cancel_expiry(self):
+        timer = self.expiry_timer
+        if timer is None:
+            return
+        self.expiry_timer = None
+        if timer.callback is not expire_batch:
+            timer.cancel()
 
     def update(self, dt: float):
         '''Called every game loop to update the position and state of the projectile, \n
         when inheriting, call super().update() to do the usual range and timer checking, and also it calls move() automatically'''
         # Check expire
         if self.range and self.range <= 0:
+            self.cancel_expiry()
             self.on_expire()
             return
-        if self.timer and self.timer <= 0:
+        if not self.expiry_timer and self.timer and self.timer <= 0:
             self.on_expire()
             return
 
@@ -97,7 +134,7 @@ class Projectile(GameObject):
             self.range -= move_distance
             if self.range < 0:
                 move_distance = -self.range
-        if self.timer:
+        if self.timer and not self.expiry_timer:
             self.timer -= dt
             if self.timer < 0:
                 move_distance = self.speed * (dt + self.timer)
@@ -105,7 +142,16 @@ class Projectile(GameObject):
         self.x += round(dx)
         self.y += round(dy)
 
-    def on_expire(self): ...
+    def on_expire(self):
+        self.alive = False
+
+
+def expire_batch(projectiles: list[Projectile]) -> None:
+    '''Callback of the timer shared by a batch of projectiles, skips the ones that left the batch since (expired early or reused by their pool)'''
+    for projectile in projectiles:
+        timer = projectile.expiry_timer
+        if timer is not None and timer.callback is expire_batch and timer.args[0] is projectiles:
+            projectile.on_expire()
 
 
 class AcceleratingProjectile(Projectile):
@@ -225,6 +271,8 @@ class HomingPorjectile(Projectile):
 
             new_angle = get_angle(frm, target)
             angle_change = new_angle - self.angle
+            if angle_change:
+                self.motion_changed = True
             if self.collider:
                 self.collider.mask.rotate(angle_change, None)
             self.angle = new_angle
@@ -356,7 +404,7 @@ class FastProjectile(Projectile):
 
 
 class FastProjectileCollider(Collider):
-    def __init__(self, heights: list[int], mask: Mask):
+    def __init__(self, heights: int | list[int], mask: Mask):
         super().__init__(heights, mask)
     
     def on_collide(self, obj: GameObject):
@@ -0,0 +1,218 @@
+from typing import Callable, Iterator, Optional
+import struct
+import time
+
+MOVE = 0
+ATTACK = 1
+HASH = 2
+LATENCY = 3
+JOIN = 4
+REMOVE = 5
+ENTER = 6
+LEAVE = 7
+HIBERNATE = 8
+# Changes to who is in the game and in which room, they happen between ticks and are replayed before the next one
+EVENTS = (JOIN, REMOVE, ENTER, LEAVE, HIBERNATE)
+# Player names are cut to this many bytes in the log
+NAME_SIZE = 32
+
+_HEADER = struct.Struct("<4sBQHHI")
+_MAGIC = b"PDRL"
+_VERSION = 2
+_RECORD = struct.Struct("<IB")
+_PAYLOADS = {
+    MOVE: struct.Struct("<Hdd"),
+    ATTACK: struct.Struct("<Hd"),
+    HASH: struct.Struct("<Q"),
+    LATENCY: struct.Struct("<Hd"),
+    JOIN: struct.Struct(f"<{NAME_SIZE}s"),
+    REMOVE: struct.Struct("<H"),
+    ENTER: struct.Struct("<HI"),
+    LEAVE: struct.Struct("<H"),
+    HIBERNATE: struct.Struct("<"),
+}
+
+
+class InputLog:
+    '''
+        Compact, append-only binary log of the inputs a game received, used to re-simulate a session
+
+        Every record is the tick it was applied at, its kind and a fixed size payload:
+        `MOVE` (player index, dx, dy), `ATTACK` (player index, angle), `HASH` (state hash checkpoint)
+        or `LATENCY` (player index, seconds), latency changes lag compensation so it is an input like the others.
+        The `EVENTS` are recorded too so sessions where players come and go can be replayed: `JOIN` (player name),
+        `REMOVE` (player index), `ENTER` (player index, room id), `LEAVE` (player index) and `HIBERNATE`
+
+        Parameters
+        ----------
+        seed `int`:
+            Seed of the game's random number generator
+        tick_rate `int`:
+            Tick rate of the recorded game
+        hash_interval `int`:
+            The game records a state hash every `hash_interval` ticks, 0 to disable
+
+        Attributes
+        ----------
+        ticks `int`:
+            Number of ticks the recorded game ran for
+
+        Methods
+        -------
+        record(self, tick `int`, kind `int`, *values):
+            Appends a record
+        save(self, path `str`) / load(path `str`) -> `InputLog`:
+            Writes the log to or reads it from a file
+        to_bytes(self) -> `bytes` / from_bytes(data `bytes`) -> `InputLog`:
+            Encodes or decodes the whole log
+    '''
+
+    def __init__(self, seed: int, tick_rate: int, hash_interval: int = 60) -> None:
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.hash_interval = hash_interval
+        self.ticks = 0
+        self.buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def record(self, tick: int, kind: int, *values) -> None:
+        self.buffer += _RECORD.pack(tick, kind)
+        self.buffer += _PAYLOADS[kind].pack(*values)
+
+    def __iter__(self) -> Iterator[tuple[int, int, tuple]]:
+        '''Yields (tick, kind, payload) for every record in order'''
+        buffer = self.buffer
+        offset = 0
+        while offset < len(buffer):
+            tick, kind = _RECORD.unpack_from(buffer, offset)
+            offset += _RECORD.size
+            payload = _PAYLOADS[kind]
+            yield tick, kind, payload.unpack_from(buffer, offset)
+            offset += payload.size
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(_MAGIC, _VERSION, self.seed, self.tick_rate, self.hash_interval, self.ticks) + self.buffer
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "InputLog":
+        magic, version, seed, tick_rate, hash_interval, ticks = _HEADER.unpack_from(data)
+        # Version 1 logs are version 2 logs without events
+        if magic != _MAGIC or not 1 <= version <= _VERSION:
+            raise ValueError("Not an input log or unsupported version")
+        log = cls(seed, tick_rate, hash_interval)
+        log.ticks = ticks
+        log.buffer = bytearray(data[_HEADER.size:])
+        return log
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "InputLog":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayResult:
+    '''
+        Outcome of `replay`
+
+        Attributes
+        ----------
+        hashes `dict`[`int`, `int`]:
+            State hash of the re-simulated game at every checkpoint tick
+        mismatches `list`[`int`]:
+            Checkpoint ticks where the re-simulated hash differs from the recorded one, empty if the replay is identical
+        ticks `int`:
+            Number of ticks simulated
+        elapsed `float`:
+            Wall time in seconds the replay took
+        tick_rate `int`:
+            Tick rate of the recorded game
+    '''
+
+    def __init__(self, hashes: dict[int, int], mismatches: list[int], ticks: int, elapsed: float, tick_rate: int) -> None:
+        self.hashes = hashes
+        self.mismatches = mismatches
+        self.ticks = ticks
+        self.elapsed = elapsed
+        self.tick_rate = tick_rate
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed else 0
+
+    @property
+    def speedup(self) -> float:
+        '''How many times faster than real time the replay ran'''
+        return self.ticks_per_second / self.tick_rate
+
+
+def encode_name(name: str) -> bytes:
+    '''Player name as stored in `JOIN` records, cut to `NAME_SIZE` bytes'''
+    return name.encode()[:NAME_SIZE]
+
+
+def apply_event(game: "Game", kind: int, values: tuple, make_player: Optional[Callable[["Game", str], "Player"]] = None) -> None:
+    '''Applies one of the recorded `EVENTS` to the game'''
+    if kind == JOIN:
+        if make_player is None:
+            raise ValueError("Players join during the recorded session, the replay needs make_player")
+        game.add_player(make_player(game, values[0].rstrip(b"\0").decode(errors="ignore")))
+    elif kind == REMOVE:
+        game.remove_player(game.players[values[0]])
+    elif kind == ENTER:
+        game.enter_room(game.players[values[0]], game.get_room(values[1]))
+    elif kind == LEAVE:
+        game.leave_room(game.players[values[0]])
+    elif kind == HIBERNATE:
+        game.hibernate()
+
+
+def replay(log: InputLog, make_game: Callable[[int], "Game"], ticks: Optional[int] = None,
+           make_player: Optional[Callable[["Game", str], "Player"]] = None) -> ReplayResult:
+    '''Re-simulates a recorded session as fast as possible, without recording it again
+
+    Parameters
+    ----------
+    log `InputLog`:
+        The recorded session
+    make_game `Callable`[[`int`], `Game`]:
+        Creates the game as it was when the recording started, from the seed of the log,
+        a game recording from its creation starts empty and gets its players from the `JOIN` records
+    ticks `int` | None:
+        Number of ticks to simulate, defaults to the length of the recording
+    make_player `Callable`[[`Game`, `str`], `Player`] | None:
+        Creates the player of a `JOIN` record from their name, the same way the recorded game did
+    '''
+    game = make_game(log.seed)
+    game.input_log = None
+    ticks = log.ticks if ticks is None else ticks
+    interval = log.hash_interval
+
+    records = iter(log)
+    pending = next(records, None)
+    recorded_hashes: dict[int, int] = {}
+    hashes: dict[int, int] = {}
+
+    start = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        while pending and pending[0] == tick:
+            _, kind, values = pending
+            if kind == HASH:
+                recorded_hashes[tick] = values[0]
+            elif kind in EVENTS:
+                apply_event(game, kind, values, make_player)
+            else:
+                game.queue_input(kind, *values)
+            pending = next(records, None)
+        game.update()
+        if interval and tick % interval == 0:
+            hashes[tick] = game.state_hash()
+    elapsed = time.perf_counter() - start
+
+    mismatches = [tick for tick, value in recorded_hashes.items() if hashes.get(tick, value) != value]
+    return ReplayResult(hashes, mismatches, ticks, elapsed, log.tick_rate)
@@ -0,0 +1,123 @@
+from functools import partial
+from typing import Callable, Optional
+
+from .damage import DamagePipeline
+from .obstacle import Obstacle, BreakableObstacle
+from .player import Player
+from .projectile import Projectile
+
+Handler = Callable[[list[tuple]], None]
+
+
+class CollisionTable:
+    '''
+        Collision responses keyed by the (type A, type B) of the colliding objects
+
+        Every contact of a tick is grouped by its pair of types and each group is handed to its handler in one call,
+        handlers are found through the MRO of both types, so a handler for (`Projectile`, `Obstacle`) also covers their subclasses.
+        Pairs without a handler fall back to `a.collider.on_collide(b)`
+
+        Methods
+        -------
+        register(self, type_a `type`, type_b `type`, handler `Callable`[[`list`[`tuple`]], None]):
+            Sets the handler of the pair, it receives every (a, b) contact of the tick for the pair
+        handler_for(self, type_a `type`, type_b `type`) -> handler | None:
+            The handler of the most specific registered pair, cached per concrete pair
+        dispatch(self, contacts `list`[`tuple`[`GameObject`, `GameObject`]]):
+            Groups the contacts by type and runs the handlers
+    '''
+
+    def __init__(self) -> None:
+        self.handlers: dict[tuple[type, type], Handler] = {}
+        self._resolved: dict[tuple[type, type], Optional[Handler]] = {}
+
+    def register(self, type_a: type, type_b: type, handler: Handler) -> None:
+        self.handlers[(type_a, type_b)] = handler
+        self._resolved.clear()
+
+    def handler_for(self, type_a: type, type_b: type) -> Optional[Handler]:
+        key = (type_a, type_b)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        handler = None
+        for base_a in type_a.__mro__:
+            for base_b in type_b.__mro__:
+                handler = self.handlers.get((base_a, base_b))
+                if handler:
+                    break
+            if handler:
+                break
+        self._resolved[key] = handler
+        return handler
+
+    def dispatch(self, contacts: list[tuple]) -> None:
+        groups: dict[tuple[type, type], list[tuple]] = {}
+        for pair in contacts:
+            key = (type(pair[0]), type(pair[1]))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [pair]
+            else:
+                group.append(pair)
+
+        for (type_a, type_b), pairs in groups.items():
+            handler = self.handler_for(type_a, type_b)
+            if handler:
+                handler(pairs)
+            else:
+                for a, b in pairs:
+                    a.collider.on_collide(b)
+
+
+def _use_pierce(projectile: Projectile, thickness: int) -> None:
+    '''Reduces the pierce of the projectile by the thickness and expires it once used up, a thickness of -1 always stops it'''
+    if thickness < 0:
+        projectile.on_expire()
+        return
+    pierce = projectile.pierce
+    if pierce is None:
+        return
+    pierce -= thickness
+    projectile.pierce = pierce
+    if pierce < 0:
+        projectile.on_expire()
+    else:
+        projectile.motion_changed = True
+
+
+def projectile_hits_obstacle(pairs: list[tuple[Projectile, Obstacle]]) -> None:
+    '''Reduces the pierce of each projectile by the thickness of the obstacle, an obstacle with a thickness of -1 always stops it'''
+    for projectile, obstacle in pairs:
+        if not projectile.alive or projectile.collider.check_collided(obstacle):
+            continue
+        _use_pierce(projectile, obstacle.thickness)
+
+
+def projectile_hits_breakable(pairs: list[tuple[Projectile, BreakableObstacle]], damage: DamagePipeline) -> None:
+    '''Queues the damage of each projectile on the obstacle and applies the pierce reduction right away,
+    a projectile stopped by an obstacle does not damage the others it overlaps'''
+    for projectile, obstacle in pairs:
+        if not projectile.alive or not obstacle.alive or projectile.collider.check_collided(obstacle):
+            continue
+        damage.add(projectile.source, obstacle, projectile.damage)
+        _use_pierce(projectile, obstacle.thickness)
+
+
+def projectile_hits_player(pairs: list[tuple[Projectile, Player]], damage: DamagePipeline) -> None:
+    '''Queues the damage of each projectile on the player, every player hit uses up 1 pierce'''
+    for projectile, player in pairs:
+        if not projectile.alive or not player.alive or projectile.collider.check_collided(player):
+            continue
+        damage.add(projectile.source, player, projectile.damage)
+        _use_pierce(projectile, 1)
+
+
+def default_collision_table(damage: DamagePipeline) -> CollisionTable:
+    '''Collision responses of the game, damage is queued on the pipeline and resolved at the end of the tick'''
+    table = CollisionTable()
+    table.register(Projectile, Obstacle, projectile_hits_obstacle)
+    table.register(Projectile, BreakableObstacle, partial(projectile_hits_breakable, damage=damage))
+    table.register(Projectile, Player, partial(projectile_hits_player, damage=damage))
+    return table
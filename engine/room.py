@@ -0,0 +1,98 @@
+from array import array
+from typing import Callable, Optional
+import zlib
+
+from .gameObject import GameObject
+from .timer import Timer
+
+_FIELDS = 4
+
+
+class Room:
+    '''
+        A room of the dungeon, its layout is only loaded when a player first enters it
+
+        A room without players hibernates: the state of its objects is packed into `frozen` and the objects are dropped,
+        `activate` loads the layout again and restores the state, so the layout loader must always return the same objects in the same order
+
+        Parameters
+        ----------
+        room_id `int`:
+            Id of the room in its game
+        load_layout `Callable`[[], `list`[`GameObject`]]:
+            Creates the obstacles and enemies of the room
+
+        Attributes
+        ----------
+        objects `list`[`GameObject`]:
+            Obstacles and enemies of the room, empty until the room is activated
+        players `set`[`Player`]:
+            Players currently in the room
+        frozen `bytes` | None:
+            Packed state of the objects while the room hibernates
+        hibernate_timer `Timer` | None:
+            Scheduled by the game once the last player leaves
+
+        Methods
+        -------
+        activate(self):
+            Loads the layout, restoring the hibernated state if there is one
+        hibernate(self):
+            Packs the state of the objects and drops them
+        update(self, dt `float`):
+            Updates every alive object of the room
+    '''
+
+    def __init__(self, room_id: int, load_layout: Callable[[], list[GameObject]]) -> None:
+        self.room_id = room_id
+        self.load_layout = load_layout
+        self.objects: list[GameObject] = []
+        self.players: set = set()
+        self.loaded = False
+        self.frozen: Optional[bytes] = None
+        self.hibernate_timer: Optional[Timer] = None
+
+    @property
+    def hibernating(self) -> bool:
+        return self.frozen is not None
+
+    def activate(self) -> None:
+        if self.hibernate_timer:
+            self.hibernate_timer.cancel()
+            self.hibernate_timer = None
+        if self.loaded:
+            return
+        self.objects = self.load_layout()
+        self.loaded = True
+        if self.frozen is not None:
+            self._restore(self.frozen)
+            self.frozen = None
+
+    def hibernate(self) -> None:
+        self.hibernate_timer = None
+        if not self.loaded or self.players:
+            return
+        state = array("d")
+        for obj in self.objects:
+            state.extend((obj.alive, obj.x, obj.y, getattr(obj, "hp", -1)))
+        self.frozen = zlib.compress(state.tobytes())
+        self.objects = []
+        self.loaded = False
+
+    def _restore(self, frozen: bytes) -> None:
+        state = array("d")
+        state.frombytes(zlib.decompress(frozen))
+        if len(state) != len(self.objects) * _FIELDS:
+            raise ValueError(f"Layout of room {self.room_id} changed while it was hibernating")
+        for i, obj in enumerate(self.objects):
+            alive, x, y, hp = state[i * _FIELDS:(i + 1) * _FIELDS]
+            obj.alive = bool(alive)
+            obj.x = round(x)
+            obj.y = round(y)
+            if hp >= 0:
+                obj.hp = round(hp)
+
+    def update(self, dt: float) -> None:
+        for obj in self.objects:
+            if obj.alive:
+                obj.update(dt)
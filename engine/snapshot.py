@@ -0,0 +1,126 @@
+from multiprocessing import shared_memory
+from typing import Iterator, Optional
+import struct
+
+from .motion import MotionTracker
+
+PLAYER = 0
+PROJECTILE = 1
+
+_SEQUENCE = struct.Struct("<Q")
+_HEADER = struct.Struct("<QII")
+_RECORD = struct.Struct("<IIiiIddd")
+
+
+class SnapshotBuffer:
+    '''
+        Double-buffered snapshot of a game's entities in shared memory, written by the simulation process and read by the network process
+
+        The region starts with a sequence number followed by 2 buffers, the writer always fills the buffer the readers are not looking at
+        and then increments the sequence, so the buffer `sequence % 2` holds the latest complete tick.
+        Each buffer is a header (tick, record count, tick time in microseconds) and fixed size records of
+        (kind, index, x, y, tick, speed, angle, acceleration), players only use the first 4 fields,
+        projectiles are written as their motion descriptor with their `MotionTracker` id as index.
+        Every tick holds every projectile, so a reader skipping ticks still sees the latest descriptors.
+        The records are only safe to use without copying while the writer has not started on the tick after next,
+        readers that take longer than a tick, like the network process encoding snapshots, use `read_copy`:
+        it copies the records of every tick it reads, a few dozen bytes per entity, and drops the ticks that were overwritten during the copy
+
+        Parameters
+        ----------
+        name `str` | None:
+            Name of an existing region to attach to, a new region is created if not given
+        max_entities `int`:
+            Maximum number of records per tick, only used when creating the region
+
+        Attributes
+        ----------
+        name `str`:
+            Name of the shared memory region, pass it to the other process to attach
+
+        Methods
+        -------
+        write_game(self, game `Game`, motion `MotionTracker`, tick_time `float`):
+            Writes the players of the game and the motion descriptors of its projectiles for its current tick, along with how long the tick took in seconds
+        read(self) -> `tuple`[`int`, `int`, `float`, `memoryview`]:
+            Sequence number, tick, tick time and a view of the records of the latest tick, without copying them, only valid until `sequence` changes
+        read_copy(self) -> `tuple`[`int`, `int`, `float`, `bytes`] | None:
+            Same as `read` with the records copied out, None if the writer may have overwritten them during the copy
+        iter_records(records `memoryview` | `bytes`) -> `Iterator`[`tuple`]:
+            Unpacks the records returned by `read` or `read_copy`
+        close(self) / unlink(self):
+            Detaches from the region / destroys it, the creator unlinks it once every process closed it
+    '''
+
+    def __init__(self, name: Optional[str] = None, max_entities: int = 4096) -> None:
+        if name is None:
+            size = _SEQUENCE.size + 2 * (_HEADER.size + max_entities * _RECORD.size)
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.memory.buf[:_SEQUENCE.size] = bytes(_SEQUENCE.size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        # The region can be rounded up by the OS, derive the capacity from the size the creator asked for
+        self.region_size = (self.memory.size - _SEQUENCE.size) // 2
+        self.max_entities = (self.region_size - _HEADER.size) // _RECORD.size
+        self.region_size = _HEADER.size + self.max_entities * _RECORD.size
+
+    @property
+    def sequence(self) -> int:
+        return _SEQUENCE.unpack_from(self.memory.buf, 0)[0]
+
+    def _offset(self, sequence: int) -> int:
+        return _SEQUENCE.size + (sequence % 2) * self.region_size
+
+    def write_game(self, game, motion: MotionTracker, tick_time: float = 0) -> None:
+        buf = self.memory.buf
+        sequence = self.sequence + 1
+        offset = self._offset(sequence)
+        pack_into = _RECORD.pack_into
+        size = _RECORD.size
+        position = offset + _HEADER.size
+        end = offset + self.region_size
+        count = 0
+        for index, player in enumerate(game.players):
+            if position >= end:
+                break
+            pack_into(buf, position, PLAYER, index, player.x, player.y, 0, 0, 0, 0)
+            position += size
+            count += 1
+        for motion_id, (tick, x, y, speed, angle, acceleration) in motion.describe(game.projectiles, game.current_tick):
+            if position >= end:
+                break
+            pack_into(buf, position, PROJECTILE, motion_id, x, y, tick, speed, angle, acceleration)
+            position += size
+            count += 1
+        _HEADER.pack_into(buf, offset, game.current_tick, count, round(tick_time * 1_000_000))
+        _SEQUENCE.pack_into(buf, 0, sequence)
+
+    def read(self) -> tuple[int, int, float, memoryview]:
+        '''The writer fills the other buffer next, then this one again as soon as it has published the next tick,
+        so the view can only be trusted while `sequence` has not changed, see `read_copy`'''
+        sequence = self.sequence
+        offset = self._offset(sequence)
+        tick, count, tick_time = _HEADER.unpack_from(self.memory.buf, offset)
+        start = offset + _HEADER.size
+        return sequence, tick, tick_time / 1_000_000, self.memory.buf[start:start + count * _RECORD.size]
+
+    def read_copy(self) -> Optional[tuple[int, int, float, bytes]]:
+        sequence, tick, tick_time, view = self.read()
+        try:
+            records = bytes(view)
+        finally:
+            view.release()
+        if self.sequence != sequence:
+            return None
+        return sequence, tick, tick_time, records
+
+    @staticmethod
+    def iter_records(records: memoryview | bytes) -> Iterator[tuple]:
+        return _RECORD.iter_unpack(records)
+
+    def close(self) -> None:
+        self.memory.close()
+
+    def unlink(self) -> None:
+        self.memory.unlink()
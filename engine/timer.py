@@ -0,0 +1,152 @@
+from typing import Callable, Optional
+
+
+class Timer:
+    '''
+        A callback scheduled on a `TimerWheel`, returned by `TimerWheel.schedule`
+
+        Attributes
+        ----------
+        deadline `int`:
+            The tick at which the callback fires
+        callback `Callable`[..., None]:
+            Function to call when the timer fires
+        args `tuple`:
+            Arguments passed to the callback
+        active `bool`:
+            False once the timer has fired or been cancelled
+
+        Methods
+        -------
+        cancel(self):
+            Removes the timer from the wheel, does nothing if it already fired
+    '''
+    __slots__ = ("deadline", "callback", "args", "_bucket")
+
+    def __init__(self, deadline: int, callback: Callable[..., None], args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self._bucket: Optional[dict] = None
+
+    @property
+    def active(self) -> bool:
+        return self._bucket is not None
+
+    def cancel(self) -> None:
+        if self._bucket is not None:
+            del self._bucket[self]
+            self._bucket = None
+
+
+class TimerWheel:
+    '''
+        Hierarchical timer wheel, fires callbacks at a given tick with O(1) schedule and cancel
+
+        Level 0 holds timers due within the next `slots` ticks, one bucket per tick.
+        Every level above covers `slots` times the span of the level below and its buckets are
+        cascaded down whenever the level below wraps around, so each timer is only touched
+        once per level instead of once per tick.
+
+        Parameters
+        ----------
+        tick_duration `float`:
+            Length of a tick in seconds, used to convert delays given in seconds
+        slots `int`:
+            Number of buckets per level
+        levels `int`:
+            Number of levels, timers further away than `slots ** levels` ticks wait in the top level
+
+        Attributes
+        ----------
+        current_tick `int`:
+            The last tick that has been processed
+
+        Methods
+        -------
+        schedule(self, delay `float`, callback, *args) -> `Timer`:
+            Fires `callback(*args)` after `delay` seconds
+        schedule_ticks(self, ticks `int`, callback, *args) -> `Timer`:
+            Fires `callback(*args)` after `ticks` ticks, at least 1
+        tick(self):
+            Advances the wheel by one tick and fires the timers that are due
+        remaining(self, timer `Timer`) -> `float`:
+            Seconds left before the timer fires
+    '''
+
+    def __init__(self, tick_duration: float, slots: int = 64, levels: int = 4) -> None:
+        if tick_duration <= 0:
+            raise ValueError("tick_duration must be positive")
+        if slots < 2 or levels < 1:
+            raise ValueError("A timer wheel needs at least 2 slots and 1 level")
+        self.tick_duration = tick_duration
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = 0
+        self._spans = [slots ** level for level in range(levels)]
+        self._wheels: list[list[dict[Timer, None]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for wheel in self._wheels for bucket in wheel)
+
+    def ticks_for(self, delay: float) -> int:
+        '''Converts a delay in seconds into a number of ticks, rounded up so timers never fire early'''
+        ticks = delay / self.tick_duration
+        whole = int(ticks)
+        return whole if whole == ticks else whole + 1
+
+    def schedule(self, delay: float, callback: Callable[..., None], *args) -> Timer:
+        return self.schedule_ticks(self.ticks_for(delay), callback, *args)
+
+    def schedule_ticks(self, ticks: int, callback: Callable[..., None], *args) -> Timer:
+        timer = Timer(self.current_tick + max(ticks, 1), callback, args)
+        self._insert(timer)
+        return timer
+
+    def remaining(self, timer: Timer) -> float:
+        if not timer.active:
+            return 0
+        return (timer.deadline - self.current_tick) * self.tick_duration
+
+    def _insert(self, timer: Timer) -> None:
+        delta = timer.deadline - self.current_tick
+        slots = self.slots
+        level = 0
+        while level < self.levels - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        bucket = self._wheels[level][(timer.deadline // self._spans[level]) % slots]
+        bucket[timer] = None
+        timer._bucket = bucket
+
+    def _cascade(self, level: int) -> None:
+        index = (self.current_tick // self._spans[level]) % self.slots
+        bucket = self._wheels[level][index]
+        if not bucket:
+            return
+        self._wheels[level][index] = {}
+        for timer in bucket:
+            self._insert(timer)
+
+    def tick(self) -> None:
+        self.current_tick += 1
+        tick = self.current_tick
+        # Move timers down from the upper levels once the level below wraps around
+        for level in range(self.levels - 1, 0, -1):
+            if tick % self._spans[level] == 0:
+                self._cascade(level)
+
+        index = tick % self.slots
+        bucket = self._wheels[0][index]
+        if not bucket:
+            return
+        self._wheels[0][index] = {}
+        for timer in list(bucket):
+            if timer._bucket is not bucket:
+                # Cancelled by an earlier callback in this bucket
+                continue
+            timer._bucket = None
+            if timer.deadline > tick:
+                # Waited in the top level for longer than a full rotation
+                self._insert(timer)
+                continue
+            timer.callback(*timer.args)
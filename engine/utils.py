@@ -75,3 +75,15 @@ def point_to_line_distance(
     else:
         raise TypeError(
             "line type must be either 'float' or 'tuple[int, int]'")
+
+
+def heights_to_mask(heights: int | list[int]) -> int:
+    '''Return the heights as a bitmask, bit `n` is set if the object collides at height `n`\n
+    Bitmasks are returned unchanged, so both forms can be passed in'''
+    if isinstance(heights, int):
+        return heights
+    mask = 0
+    for height in heights:
+        mask |= 1 << height
+    return mask
+
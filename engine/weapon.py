@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Optional
+
+from .collider import Collider
+from .emitter import Emitter
+from .timer import Timer, TimerWheel
+
 class AbstractWeapon(ABC):
     @abstractmethod
     def __init__(self, name:str, description:str, level:int, enchantments:dict, cooldown:float, *args, **kwargs) -> None:
@@ -7,7 +13,20 @@ class AbstractWeapon(ABC):
         self.level = level
         self.enchantments = enchantments
         self.cooldown = cooldown
-        self.current_cooldown:float = 0
+        self.cooldown_timer:Optional[Timer] = None
+
+    @property
+    def ready(self) -> bool:
+        '''True if the weapon is not on cooldown'''
+        return self.cooldown_timer is None or not self.cooldown_timer.active
+
+    def start_cooldown(self, timers:TimerWheel) -> None:
+        '''Puts the weapon on cooldown, `on_cooldown_ready` is called by the timer wheel once it is over'''
+        if self.cooldown_timer:
+            self.cooldown_timer.cancel()
+        self.cooldown_timer = timers.schedule(self.cooldown, self.on_cooldown_ready)
+
+    def on_cooldown_ready(self):...
     
     @abstractmethod
     def on_attack(self, angle:float):...
@@ -26,5 +45,55 @@ class AbstractWeapon(ABC):
 
 class RangedWeapon(AbstractWeapon):
     ...
-    
-    
\ No newline at end of file
+
+
+class EmitterWeapon(RangedWeapon):
+    '''
+        Ranged weapon firing an emitter pattern of projectiles from its owner
+
+        Parameters
+        ----------
+        game `Game`:
+            Game the projectiles are added to
+        owner `GameObject`:
+            Wielder of the weapon, projectiles start at its position and it is their source
+        emitter `Emitter`:
+            Pattern fired on every attack
+        projectile `type`:
+            Class of the projectiles, must accept the `Projectile` arguments by keyword
+        speed `int`|`float` / damage `int`:
+            Speed and damage of every projectile
+        collider `Collider` | None:
+            Template of the projectile colliders, see `Emitter.emit`
+        pierce `int` | None / range `int` | None / timer `float` | None:
+            Passed on to every projectile
+    '''
+
+    def __init__(self, name: str, description: str, level: int, enchantments: dict, cooldown: float,
+                 game, owner, emitter: Emitter, projectile: type, speed: int | float, damage: int, collider: Optional[Collider] = None,
+                 pierce: Optional[int] = None, range: Optional[int] = None, timer: Optional[float] = None) -> None:
+        super().__init__(name, description, level, enchantments, cooldown)
+        self.game = game
+        self.owner = owner
+        self.emitter = emitter
+        self.projectile = projectile
+        self.speed = speed
+        self.damage = damage
+        self.collider = collider
+        self.pierce = pierce
+        self.range = range
+        self.timer = timer
+
+    def on_attack(self, angle: float):
+        owner = self.owner
+        self.emitter.emit(self.game, self.projectile, owner.x, owner.y, angle, self.speed, self.collider,
+                          name=self.name, description=self.description, damage=self.damage, source=owner,
+                          pierce=self.pierce, range=self.range, timer=self.timer)
+
+    def on_equip(self): ...
+
+    def on_unequip(self): ...
+
+    def on_levelup(self): ...
+
+    def on_enchant(self, enchantment: dict): ...
@@ -0,0 +1,163 @@
+import websockets
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from engine.profiling import format_stats
+
+
+class BotStats:
+    '''
+        Measurements collected by the bots
+
+        Attributes
+        ----------
+        latencies `list`[`float`]:
+            Time in ms between sending an input and receiving the first snapshot acknowledging it
+        intervals `list`[`float`]:
+            Time in ms between 2 consecutive snapshots received by the same bot
+        snapshots `int`:
+            Number of snapshots received
+        inputs `int`:
+            Number of inputs sent
+        failed `int`:
+            Number of bots that could not connect or got disconnected
+    '''
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.intervals: list[float] = []
+        self.snapshots = 0
+        self.inputs = 0
+        self.failed = 0
+
+
+async def bot(uri: str, name: str, duration: float, input_rate: float, attack_chance: float, stats: BotStats) -> None:
+    '''Logs in, then sends movement at `input_rate` per second and occasional attacks until `duration` is over'''
+    try:
+        async with websockets.connect(uri) as conn:
+            await conn.send(json.dumps({"type": "login", "name": name}))
+            login = json.loads(await conn.recv())
+            index = login["player"]
+            end = time.perf_counter() + duration
+            # Tick of the latest snapshot received, sent with every input so the server can measure the round trip
+            last_tick = 0
+
+            async def send_inputs():
+                rng = random.Random(name)
+                angle = rng.uniform(0, 2 * math.pi)
+                while time.perf_counter() < end:
+                    # Players mostly keep their direction, with the occasional turn
+                    if rng.random() < 0.1:
+                        angle = rng.uniform(0, 2 * math.pi)
+                    now = time.perf_counter()
+                    await conn.send(json.dumps({"type": "move", "dx": math.cos(angle), "dy": math.sin(angle), "t": now, "tick": last_tick}))
+                    stats.inputs += 1
+                    if rng.random() < attack_chance:
+                        await conn.send(json.dumps({"type": "attack", "angle": rng.uniform(0, 2 * math.pi), "t": now, "tick": last_tick}))
+                        stats.inputs += 1
+                    await asyncio.sleep(1 / input_rate)
+
+            async def receive_snapshots():
+                nonlocal last_tick
+                last_arrival = None
+                last_ack = 0
+                while time.perf_counter() < end:
+                    try:
+                        message = json.loads(await asyncio.wait_for(conn.recv(), max(end - time.perf_counter(), 0.01)))
+                    except asyncio.TimeoutError:
+                        return
+                    if message["type"] != "snapshot":
+                        continue
+                    arrival = time.perf_counter()
+                    stats.snapshots += 1
+                    last_tick = message["tick"]
+                    if last_arrival is not None:
+                        stats.intervals.append((arrival - last_arrival) * 1000)
+                    last_arrival = arrival
+                    ack = message["acks"][index]
+                    if ack and ack != last_ack:
+                        stats.latencies.append((arrival - ack) * 1000)
+                        last_ack = ack
+
+            await asyncio.gather(send_inputs(), receive_snapshots())
+    except (OSError, websockets.ConnectionClosed):
+        stats.failed += 1
+
+
+async def server_stats(uri: str) -> dict:
+    async with websockets.connect(uri) as conn:
+        await conn.send(json.dumps({"type": "stats"}))
+        return json.loads(await conn.recv())
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def report(stats: BotStats, server: dict, clients: int, duration: float) -> str:
+    '''Formats the results, rooms per core is how many games one core can run within the tick budget at the measured mean cost per tick,
+    simulation, snapshot encoding and broadcasting included'''
+    expected_interval = server["tick_budget"]
+    jitter = [abs(interval - expected_interval) for interval in stats.intervals]
+    rooms_per_core = server["tick_budget"] / server["cost_mean"] if server["cost_mean"] else math.inf
+    return "\n".join([
+        f"clients: {clients} ({stats.failed} failed), games: {server['games']}, duration: {duration:.0f}s",
+        f"inputs sent: {stats.inputs} ({stats.inputs / duration:.0f}/s), snapshots received: {stats.snapshots} ({stats.snapshots / duration:.0f}/s)",
+        f"snapshot latency ms: p50 {percentile(stats.latencies, 50):.1f}, p99 {percentile(stats.latencies, 99):.1f}",
+        f"inter-arrival jitter ms: p50 {percentile(jitter, 50):.1f}, p99 {percentile(jitter, 99):.1f} (expected interval {expected_interval:.1f})",
+        f"server tick ms: mean {server['tick_mean']:.3f}, p99 {server['tick_p99']:.3f}, budget {server['tick_budget']:.1f}",
+        f"server cost per tick ms: {server['cost_mean']:.3f} (network process {server['frame_mean']:.3f})",
+        f"rooms per core: {rooms_per_core:.0f}",
+        # Only when the server runs with DUNGEON_PROFILE=1
+        *([format_stats(server["profile"])] if server.get("profile") else []),
+    ])
+
+
+async def run(uri: str, clients: int, duration: float, input_rate: float, attack_chance: float, ramp: float) -> str:
+    stats = BotStats()
+    tasks = []
+    for i in range(clients):
+        tasks.append(asyncio.create_task(bot(uri, f"bot{i}", duration, input_rate, attack_chance, stats)))
+        # Spread logins so the server sees a ramp instead of a single burst
+        await asyncio.sleep(ramp / clients)
+    # Ask for server statistics while the bots are still connected
+    await asyncio.sleep(max(duration - ramp - 1, 0))
+    server = await server_stats(uri)
+    await asyncio.gather(*tasks)
+    return report(stats, server, clients, duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Spawns simulated clients against the game server and reports latency, jitter and tick times")
+    parser.add_argument("--uri", default="ws://localhost:8765")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30, help="seconds each bot stays connected")
+    parser.add_argument("--input-rate", type=float, default=30, help="inputs per second per bot")
+    parser.add_argument("--attack-chance", type=float, default=0.05, help="chance of an attack with each input")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which the bots log in")
+    parser.add_argument("--spawn-server", action="store_true", help="start server.py in a subprocess for the test")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")])
+        time.sleep(1)
+    try:
+        print(asyncio.run(run(args.uri, args.clients, args.duration, args.input_rate, args.attack_chance, args.ramp)))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import importlib
+import sys
+
+from engine import AllocationProfiler, InputLog, replay
+
+
+def main(argv: list[str]) -> int:
+    '''`python replay.py [--profile] <log> <module:make_game>`, replays a recorded session and prints the result, doubles as a benchmark\n
+    Players joining during the session are created with the `make_player(game, name)` of the same module, `server:make_game` replays server logs.
+    `--profile` also reports the allocations per tick phase and engine function and the GC pauses, tick rates are not comparable with it on'''
+    profiler = None
+    if "--profile" in argv:
+        argv = [arg for arg in argv if arg != "--profile"]
+        profiler = AllocationProfiler()
+    if len(argv) != 2:
+        print("usage: python replay.py [--profile] <log> <module:make_game>")
+        return 2
+    module_name, _, function_name = argv[1].partition(":")
+    module = importlib.import_module(module_name)
+    load_game = getattr(module, function_name)
+
+    def make_game(seed):
+        game = load_game(seed)
+        game.profiler = profiler
+        return game
+
+    if profiler is not None:
+        profiler.start()
+    try:
+        result = replay(InputLog.load(argv[0]), make_game, make_player=getattr(module, "make_player", None))
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    print(f"{result.ticks} ticks in {result.elapsed:.3f}s ({result.ticks_per_second:.0f} ticks/s, {result.speedup:.1f}x real time)")
+    if profiler is not None:
+        print(profiler.report())
+    if result.mismatches:
+        print(f"desync at ticks {result.mismatches}")
+        return 1
+    print("state hashes identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,36 +1,476 @@
 import websockets
 import asyncio
 import json
+import math
+import multiprocessing
 import os
+import queue
+import random
+import statistics
+import time
+from collections import deque
 
 import pygame
 
-from engine import Game, player
+from engine import AllocationProfiler, Collider, Game, Mask, Projectile, SpreadEmitter, player
+from engine.dungeon import DungeonGenerator, ROOM_WIDTH, ROOM_HEIGHT
+from engine.inputs import InputBuffer
+from engine.motion import MotionTracker
+from engine.replay import MOVE, ATTACK, LATENCY
+from engine.weapon import EmitterWeapon
+from engine.snapshot import SnapshotBuffer, PLAYER, PROJECTILE
 
 
+HOST = os.environ.get("DUNGEON_HOST", "localhost")
+PORT = int(os.environ.get("DUNGEON_PORT", 8765))
+TICK_RATE = 60
+MAX_PLAYERS = 2
+# Runs every game in its own simulation process, snapshots are shared with the network process through shared memory
+SIMULATION_PROCESSES = os.environ.get("DUNGEON_SIMULATION_PROCESSES", "0") == "1"
+GENERATOR_WORKERS = int(os.environ.get("DUNGEON_GENERATOR_WORKERS", 1))
+# Seconds a game with nobody connected is kept for its players to come back, then it is closed and its memory released
+HIBERNATE_TTL = float(os.environ.get("DUNGEON_HIBERNATE_TTL", 600))
+DIFFICULTY = 1
+# Weight of each new round trip sample in the latency estimate of a player
+LATENCY_SMOOTHING = 0.1
+# Debug mode, attributes allocations to tick phases and engine functions and times GC pauses, reported by the stats message.
+# Only games simulated in the network process are profiled
+PROFILE = os.environ.get("DUNGEON_PROFILE", "0") == "1"
+# Seconds a simulation process gets to save its log and exit when its game closes before it is terminated
+WORKER_STOP_TIMEOUT = 5
+# Directory where every game saves its input log when it closes, to reproduce production sessions with
+# `python replay.py <log> server:make_game`, games are not recorded if unset
+RECORD_DIR = os.environ.get("DUNGEON_RECORD_DIR")
 
+# Created in main, so processes importing this module do not start their own pool
+dungeon: DungeonGenerator | None = None
+profiler: AllocationProfiler | None = None
 
-# games:list[Game] = []
 
-# async def handler(conn:websockets.ServerProtocol):
-#     print("Connected with", conn.id)
-#     async for message in conn:
-#         message = json.loads(message)
-#         print(message)
-#         if message["type"] == "login":
-#             if not games or games[-1]
+class Arrow(Projectile):
+    '''Projectile of the default bow, the server never draws'''
+    def draw(self, camera_pos: tuple[int, int]): ...
 
 
+def make_player(game: Game, name: str) -> player.Player:
+    '''Player of a client joining the game, armed with the default bow, also used by `replay.py` to rebuild the players of a recorded session'''
+    game_player = player.Player(name, ROOM_WIDTH // 2, ROOM_HEIGHT // 2, None, [], 100, 10, 5, 100, 0, 200, 0.05, 0.5, Collider(0b001, Mask(32, 32)))
+    game_player.weapon = EmitterWeapon("Bow", "", 1, {}, 0.5, game, game_player, SpreadEmitter(3, 0.3), Arrow, 480, 10,
+                                       Collider(0b001, Mask(8, 8)), timer=1.5)
+    return game_player
 
 
+def make_game(seed: int, record: bool = False, generator: DungeonGenerator | None = None, profiler: AllocationProfiler | None = None) -> Game:
+    '''Game of a session, rooms come from the generator or are generated in the calling process if none is given\n
+    Used as is by `replay.py` to replay the logs saved in `RECORD_DIR`, generated rooms only depend on the seed'''
+    load_layout = (generator or DungeonGenerator(0)).loader(seed, DIFFICULTY)
+    return Game(MAX_PLAYERS, tick_rate=TICK_RATE, seed=seed, record=record, load_layout=load_layout, profiler=profiler)
 
 
+def log_path(seed: int) -> str | None:
+    '''File the input log of the game is saved to when it closes, None if games are not recorded'''
+    if not RECORD_DIR:
+        return None
+    return os.path.join(RECORD_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{seed}.log")
 
 
-# async def main():
-#     async with websockets.serve(handler, "localhost", 8765):
-#         print("server started")
-#         await asyncio.Future()
+def apply_command(game: Game, command: tuple) -> None:
+    '''Applies a command sent by the network side: ("join", name), ("enter", index), ("leave", index) or ("inputs", index, `InputBuffer`)'''
+    kind = command[0]
+    if kind == "inputs":
+        game.queue_inputs(command[1], command[2])
+    elif kind == "join":
+        game.add_player(make_player(game, command[1]))
+    elif kind == "enter":
+        game_player = game.players[command[1]]
+        game.enter_room(game_player, game_player.room or game.get_room(0))
+    elif kind == "leave":
+        game.leave_room(game.players[command[1]])
+        if not game.active_rooms:
+            game.hibernate()
 
 
-# asyncio.run(main())
+def simulation_worker(snapshot_name: str, commands: multiprocessing.Queue, seed: int, record_path: str | None) -> None:
+    '''Runs a game in its own process, writing every tick to the shared snapshot buffer\n
+    Blocks on the command queue instead of ticking while no player is in a room, rooms are generated in the worker itself.
+    The game is recorded if `record_path` is given, the log is saved there when the worker stops'''
+    game = make_game(seed, record=record_path is not None)
+    snapshot = SnapshotBuffer(snapshot_name)
+    motion = MotionTracker()
+    next_tick = time.perf_counter()
+    try:
+        while True:
+            while True:
+                try:
+                    command = commands.get_nowait() if game.active_rooms else commands.get()
+                except queue.Empty:
+                    break
+                if command[0] == "stop":
+                    if record_path:
+                        game.input_log.save(record_path)
+                    return
+                if not game.active_rooms:
+                    next_tick = time.perf_counter()
+                apply_command(game, command)
+            start = time.perf_counter()
+            game.update()
+            snapshot.write_game(game, motion, time.perf_counter() - start)
+            next_tick += game.tick_duration
+            time.sleep(max(0, next_tick - time.perf_counter()))
+    finally:
+        snapshot.close()
+
+
+class GameSession:
+    '''
+        A game and the connections of its players, the game is simulated in the network process
+
+        Attributes
+        ----------
+        names `list`[`str`]:
+            Names of the players in the game, in order of their index
+        connections `dict`[`ServerConnection`, `int`]:
+            Connected clients and the index of their player in the game
+        acks `list`[`float`]:
+            Client time of the last input received from each player, sent back in snapshots so clients can measure latency
+        latencies `list`[`float`]:
+            Smoothed round trip of each player in ticks, from the tick of the latest snapshot their inputs say they had received,
+            given to the game as a `LATENCY` input whenever it changes by a whole tick
+        current_tick `int`:
+            Tick of the latest snapshot sent
+        tick_times `deque`[`float`]:
+            Duration in seconds of the simulation of the most recent ticks
+        frame_times `deque`[`float`]:
+            Time in seconds the network process spent on each of the most recent ticks, simulation included when it runs in this process,
+            snapshot reading, encoding and broadcasting included in every case
+        motion `MotionTracker`:
+            Motion descriptors of the projectiles sent so far, snapshots only carry the projectiles whose motion changed
+            and the ids of the expired ones, clients move the others forward with `engine.motion.extrapolate`
+        resync `bool`:
+            Set when a client connects, the next snapshot carries every projectile with `full` set
+        eviction `asyncio.TimerHandle` | None:
+            Closes the session `HIBERNATE_TTL` seconds after everyone left, cancelled if a player comes back
+    '''
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.connections: dict = {}
+        self.acks: list[float] = []
+        self.latencies: list[float] = []
+        self.current_tick = 0
+        self.tick_times: deque[float] = deque(maxlen=TICK_RATE * 10)
+        self.frame_times: deque[float] = deque(maxlen=TICK_RATE * 10)
+        self.motion = MotionTracker()
+        self.resync = False
+        self.eviction: asyncio.TimerHandle | None = None
+        self.start()
+
+    def start(self) -> None:
+        '''Creates the game, the first rooms of the seed are already generated or being generated by the dungeon workers'''
+        self.seed = dungeon.take_seed(DIFFICULTY)
+        self.game = make_game(self.seed, record=bool(RECORD_DIR), generator=dungeon, profiler=profiler)
+
+    def send(self, command: tuple) -> None:
+        apply_command(self.game, command)
+
+    def add_player(self, name: str) -> int:
+        self.send(("join", name))
+        self.names.append(name)
+        self.acks.append(0)
+        self.latencies.append(0)
+        return len(self.names) - 1
+
+    def queue_input(self, kind: int, index: int, *values) -> None:
+        '''Only buffers the input, the game coalesces movement and applies everything once per tick'''
+        self.game.queue_input(kind, index, *values)
+
+    def ack(self, index: int, client_time) -> None:
+        '''Records the client time of the player's latest input, sent back to every client so it must be a finite number'''
+        checked = finite(client_time)
+        if checked is not None:
+            self.acks[index] = checked[0]
+
+    def observe(self, index: int, seen_tick: int) -> None:
+        '''Updates the latency of the player from the tick of the latest snapshot they had when sending an input'''
+        previous = self.latencies[index]
+        latency = self.latencies[index] = previous + (max(0, self.current_tick - seen_tick) - previous) * LATENCY_SMOOTHING
+        if round(latency) != round(previous):
+            self.queue_input(LATENCY, index, round(latency) / TICK_RATE)
+
+    def tick(self) -> str | None:
+        '''Advances the game and returns the snapshot to broadcast'''
+        game = self.game
+        start = time.perf_counter()
+        game.update()
+        self.tick_times.append(time.perf_counter() - start)
+        tick = game.current_tick
+        return self.encode(tick, [[p.player_name, p.x, p.y] for p in game.players], self.motion.describe(game.projectiles, tick))
+
+    def encode(self, tick: int, players: list[list], descriptors) -> str:
+        '''Snapshot message of the tick, projectiles in steady flight are left out'''
+        self.current_tick = tick
+        changed, expired = self.motion.diff(descriptors)
+        full = self.resync
+        if full:
+            changed = self.motion.full()
+            self.resync = False
+        return json.dumps({
+            "type": "snapshot",
+            "tick": tick,
+            "players": players,
+            "projectiles": changed,
+            "expired": expired,
+            "full": full,
+            "acks": self.acks,
+        })
+
+    def close(self) -> None:
+        path = log_path(self.seed)
+        if path and self.game is not None:
+            self.game.input_log.save(path)
+        self.game = None
+
+    def connect(self, conn, index: int) -> None:
+        '''Attaches a connection to a player, restarting the tick task if the game was hibernating'''
+        self.connections[conn] = index
+        self.resync = True
+        asyncio.create_task(self.enter(index))
+        if self not in games:
+            if self.eviction:
+                self.eviction.cancel()
+                self.eviction = None
+            for name in self.names:
+                hibernated.pop(name, None)
+            games.append(self)
+            asyncio.create_task(self.run())
+
+    async def enter(self, index: int) -> None:
+        '''Puts the player in their room once its layout is generated, loading the room then hits the dungeon cache instead of blocking the event loop'''
+        room = self.game.players[index].room
+        await dungeon.get_async(self.seed, DIFFICULTY, room.room_id if room else 0)
+        # The player may have left while the layout was generated
+        if index in self.connections.values():
+            self.send(("enter", index))
+
+    def disconnect(self, conn) -> None:
+        index = self.connections.pop(conn, None)
+        if index is not None:
+            self.send(("leave", index))
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self.connections:
+            start = time.perf_counter()
+            snapshot = self.tick()
+            if snapshot:
+                websockets.broadcast(self.connections, snapshot)
+                self.frame_times.append(time.perf_counter() - start)
+            next_tick += 1 / TICK_RATE
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+        # Everyone left, the rooms hibernate on the last leave, stop ticking until one of the players logs in again
+        games.remove(self)
+        for name in self.names:
+            hibernated[name] = self
+        self.eviction = loop.call_later(HIBERNATE_TTL, self.evict)
+
+    def evict(self) -> None:
+        '''Forgets the hibernated game and closes it, its players start a new game if they log in again'''
+        self.eviction = None
+        for name in self.names:
+            if hibernated.get(name) is self:
+                del hibernated[name]
+        # Closing can wait on a simulation process or write a log, done in a thread so the other games keep ticking
+        asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+class SharedMemorySession(GameSession):
+    '''
+        A game simulated by `simulation_worker` in its own process
+
+        Commands go to the worker through a queue and snapshots are read straight from the shared memory buffer,
+        so the simulation never pays for encoding or sending them.
+        Inputs are coalesced per player in an `InputBuffer` and sent to the worker once per tick
+    '''
+    def start(self) -> None:
+        '''Starts the worker, it generates the rooms itself so the session does not take one of the warmed seeds'''
+        self.seed = random.getrandbits(63)
+        self.game = None
+        self.snapshot = SnapshotBuffer()
+        self.sequence = self.snapshot.sequence
+        self.commands = multiprocessing.Queue()
+        self.buffers: list[InputBuffer] = []
+        self.pending: list[int] = []
+        self.process = multiprocessing.Process(target=simulation_worker, args=(self.snapshot.name, self.commands, self.seed, log_path(self.seed)), daemon=True)
+        self.process.start()
+
+    def send(self, command: tuple) -> None:
+        self.commands.put(command)
+
+    async def enter(self, index: int) -> None:
+        '''The worker loads the room itself, in its own process'''
+        self.send(("enter", index))
+
+    def add_player(self, name: str) -> int:
+        self.buffers.append(InputBuffer())
+        return super().add_player(name)
+
+    def queue_input(self, kind: int, index: int, *values) -> None:
+        buffer = self.buffers[index]
+        if not buffer:
+            self.pending.append(index)
+        buffer.push(kind, *values)
+
+    def flush_inputs(self) -> None:
+        '''Sends the buffered inputs to the worker, one command per player per tick however many messages they sent'''
+        for index in self.pending:
+            self.send(("inputs", index, self.buffers[index]))
+            self.buffers[index] = InputBuffer()
+        self.pending.clear()
+
+    def tick(self) -> str | None:
+        if self.pending:
+            self.flush_inputs()
+        if self.snapshot.sequence == self.sequence:
+            return None
+        # None if the worker started overwriting the buffer while it was copied, the next tick reads the newer one
+        latest = self.snapshot.read_copy()
+        if latest is None:
+            return None
+        sequence, tick, tick_time, records = latest
+        self.sequence = sequence
+        self.tick_times.append(tick_time)
+        names = self.names
+        players = []
+        descriptors = []
+        for kind, index, x, y, start, speed, angle, acceleration in SnapshotBuffer.iter_records(records):
+            if kind == PLAYER:
+                players.append([names[index], x, y])
+            elif kind == PROJECTILE:
+                descriptors.append((index, (start, x, y, speed, angle, acceleration)))
+        return self.encode(tick, players, descriptors)
+
+    def close(self) -> None:
+        '''Stops the worker and waits for it to exit, blocking, `evict` runs it in a thread'''
+        self.commands.put(("stop",))
+        self.process.join(WORKER_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.snapshot.close()
+        self.snapshot.unlink()
+
+
+games: list[GameSession] = []
+hibernated: dict[str, GameSession] = {}
+
+
+def find_player(name: str) -> tuple[GameSession, int] | None:
+    '''Finds a disconnected player with the name in a running or hibernating game'''
+    for session in [*games, *hibernated.values()]:
+        connected = set(session.connections.values())
+        for index, player_name in enumerate(session.names):
+            if player_name == name and index not in connected:
+                return session, index
+    return None
+
+
+def join_game(name: str, conn) -> tuple[GameSession, int]:
+    '''Puts a returning player back in their game, otherwise adds them to the last game if it is not full or starts a new game'''
+    found = find_player(name)
+    if found:
+        session, index = found
+        session.connect(conn, index)
+        return session, index
+    if not games or len(games[-1].names) >= MAX_PLAYERS:
+        session = SharedMemorySession() if SIMULATION_PROCESSES else GameSession()
+    else:
+        session = games[-1]
+    index = session.add_player(name)
+    session.connect(conn, index)
+    return session, index
+
+
+def stats() -> dict:
+    '''Tick time statistics of every running game, in milliseconds, and the profiler statistics when `PROFILE` is on\n
+    `cost_mean` is the CPU time a game needs per tick, simulation plus snapshot encoding and broadcasting, whichever process they run in'''
+    tick_times = [tick_time * 1000 for session in games for tick_time in session.tick_times]
+    frame_times = [frame_time * 1000 for session in games for frame_time in session.frame_times]
+    tick_mean = statistics.fmean(tick_times) if tick_times else 0
+    frame_mean = statistics.fmean(frame_times) if frame_times else 0
+    return {
+        "type": "stats",
+        "games": len(games),
+        "players": sum(len(session.connections) for session in games),
+        "tick_mean": tick_mean,
+        "tick_p99": statistics.quantiles(tick_times, n=100)[98] if len(tick_times) > 1 else 0,
+        "frame_mean": frame_mean,
+        "cost_mean": frame_mean + tick_mean if SIMULATION_PROCESSES else frame_mean,
+        "tick_budget": 1000 / TICK_RATE,
+        "profile": profiler.stats() if profiler else None,
+    }
+
+
+def finite(*values) -> tuple[float, ...] | None:
+    '''The values of a client message as floats, None if one of them is not a finite number, `json.loads` accepts NaN and Infinity'''
+    try:
+        numbers = tuple(float(value) for value in values)
+    except (TypeError, ValueError):
+        return None
+    return numbers if all(map(math.isfinite, numbers)) else None
+
+
+async def handler(conn: websockets.ServerConnection):
+    print("Connected with", conn.id)
+    session, index = None, 0
+    try:
+        async for message in conn:
+            message = json.loads(message)
+            if message["type"] == "login" and session is None:
+                session, index = join_game(message["name"], conn)
+                await conn.send(json.dumps({"type": "login", "player": index}))
+            elif message["type"] == "stats":
+                await conn.send(json.dumps(stats()))
+            elif session is None:
+                continue
+            elif message["type"] == "move":
+                # Malformed inputs are dropped, they would raise in the tick and stop the game for every player
+                direction = finite(message.get("dx"), message.get("dy"))
+                if direction is None:
+                    continue
+                session.queue_input(MOVE, index, *direction)
+                session.ack(index, message.get("t"))
+            elif message["type"] == "attack":
+                angle = finite(message.get("angle"))
+                if angle is None:
+                    continue
+                session.queue_input(ATTACK, index, *angle)
+                session.ack(index, message.get("t"))
+            if "tick" in message and session is not None:
+                seen_tick = finite(message["tick"])
+                if seen_tick is not None:
+                    session.observe(index, int(seen_tick[0]))
+    finally:
+        if session:
+            session.disconnect(conn)
+
+
+async def main():
+    global dungeon, profiler
+    dungeon = DungeonGenerator(GENERATOR_WORKERS)
+    if PROFILE:
+        profiler = AllocationProfiler()
+        profiler.start()
+    try:
+        async with websockets.serve(handler, HOST, PORT):
+            print("server started")
+            await asyncio.Future()
+    finally:
+        for session in {*games, *hibernated.values()}:
+            session.close()
+        dungeon.shutdown()
+        if profiler:
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
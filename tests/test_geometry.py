@@ -0,0 +1,102 @@
+import math
+import random
+
+import pytest
+
+from engine import collider, geometry, mask
+from engine.collider import FastCollider
+from engine.mask import Mask
+from engine.utils import point_to_line_distance
+
+# From triangles to polygons bigger than any mask the engine creates
+POINT_COUNTS = [3, 4, 6, 8, 32, 64]
+
+
+def random_polygon(rng: random.Random, count: int) -> list[tuple[int, int]]:
+    '''Corners of a polygon going around a random center, at random distances from it'''
+    center_x, center_y = rng.randint(-100, 100), rng.randint(-100, 100)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(count))
+    polygon = []
+    for angle in angles:
+        distance = rng.uniform(10, 200)
+        polygon.append((round(center_x + distance * math.cos(angle)), round(center_y + distance * math.sin(angle))))
+    return polygon
+
+
+def reference_line_distances(points, line_pt_1, line_pt_2) -> list[float]:
+    return [point_to_line_distance(point, (tuple(line_pt_1), tuple(line_pt_2))) for point in points]
+
+
+def reference_rotate_points(points, cosang, sinang, pivot_x, pivot_y) -> list[tuple[float, float]]:
+    '''Rotation as a complex product, clockwise on screen for a positive angle'''
+    pivot = complex(pivot_x, pivot_y)
+    rotated = [(complex(x, y) - pivot) * complex(cosang, -sinang) + pivot for x, y in points]
+    return [(point.real, point.imag) for point in rotated]
+
+
+def assert_points_equal(points, expected) -> None:
+    assert len(points) == len(expected)
+    for point, expected_point in zip(points, expected):
+        assert point == pytest.approx(expected_point, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("count", POINT_COUNTS)
+def test_line_distances(count):
+    rng = random.Random(count)
+    for _ in range(20):
+        points = random_polygon(rng, count)
+        line = (rng.uniform(-50, 50), rng.uniform(-50, 50)), (rng.uniform(-50, 50), rng.uniform(-50, 50))
+        expected = reference_line_distances(points, *line)
+        assert geometry.line_distances(points, *line) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+        assert [geometry.line_distance(point, *line) for point in points] == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("count", POINT_COUNTS)
+def test_rotate_points(count):
+    rng = random.Random(count)
+    for _ in range(20):
+        points = random_polygon(rng, count)
+        theta = rng.uniform(-2 * math.pi, 2 * math.pi)
+        args = (math.cos(theta), math.sin(theta), rng.uniform(-50, 50), rng.uniform(-50, 50))
+        assert_points_equal(geometry.rotate_points(points, *args), reference_rotate_points(points, *args))
+
+
+def outcome(function, *args):
+    '''Result of the call, or the type of the exception it raised, degenerate polygons must fail the same way with both kernels'''
+    try:
+        return function(*args)
+    except Exception as error:
+        return type(error)
+
+
+@pytest.mark.parametrize("count", POINT_COUNTS)
+def test_fast_collider_on_move(monkeypatch, count):
+    rng = random.Random(count)
+    for _ in range(20):
+        polygon = random_polygon(rng, count)
+        moves = [(rng.randint(-20, 20), rng.randint(-20, 20)) for _ in range(3)]
+        results = []
+        for line_distances in (geometry.line_distances, reference_line_distances):
+            monkeypatch.setattr(collider, "line_distances", line_distances)
+            fast_collider = FastCollider(0b001, Mask(corners=list(polygon)))
+            results.append([(outcome(fast_collider.on_move, move), list(fast_collider.mask.corners)) for move in moves])
+        assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("count", POINT_COUNTS)
+def test_mask_rotate(monkeypatch, count):
+    rng = random.Random(count)
+    for _ in range(20):
+        polygon = random_polygon(rng, count)
+        degrees = rng.uniform(-360, 360)
+        pivot = rng.choice((None, (rng.randint(-50, 50), rng.randint(-50, 50))))
+        masks = []
+        for rotate_points in (geometry.rotate_points, reference_rotate_points):
+            monkeypatch.setattr(mask, "rotate_points", rotate_points)
+            rotated = Mask(corners=list(polygon))
+            rotated.rotate(degrees, pivot)
+            masks.append(rotated)
+        rotated, expected = masks
+        assert_points_equal(rotated.corners, expected.corners)
+        assert rotated.size == pytest.approx(expected.size, rel=1e-9, abs=1e-9)
+        assert rotated.center == pytest.approx(expected.center, rel=1e-9, abs=1e-9)